@@ -1,16 +1,30 @@
+import threading
 import warnings
-from collections import Counter
-from typing import Any, Callable, Dict, Optional, Type
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from hashlib import blake2b
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple, Type
 
+from google.protobuf.descriptor import Descriptor
 from google.protobuf.descriptor_pb2 import FileDescriptorProto, FileDescriptorSet
 from google.protobuf.descriptor_pool import DescriptorPool
-from google.protobuf.message_factory import GetMessageClassesForFiles
+from google.protobuf.internal import api_implementation
+from google.protobuf.message_factory import GetMessageClass
 
 from mcap.decoder import DecoderFactory as McapDecoderFactory
 from mcap.exceptions import McapError
 from mcap.records import Message, Schema
 from mcap.well_known import MessageEncoding, SchemaEncoding
 
+if api_implementation.Type() == "python":
+    warnings.warn(
+        "protobuf is using its pure-Python implementation, which decodes messages many times "
+        "slower than the upb implementation included in the protobuf wheels. Unset "
+        "PROTOCOL_BUFFERS_PYTHON_IMPLEMENTATION or install a protobuf wheel for this platform "
+        "to use it.",
+        RuntimeWarning,
+    )
+
 
 class McapProtobufDecodeError(McapError):
     """Raised when a Message record cannot be decoded as a Protobuf message."""
@@ -18,13 +32,50 @@ class McapProtobufDecodeError(McapError):
     pass
 
 
+# Message classes built by any DecoderFactory with a shared descriptor pool, keyed by schema name
+# and a digest of the schema data, so that factories decoding the same schemas don't each build
+# them.
+_shared_types: "OrderedDict[Tuple[str, bytes], Type[Any]]" = OrderedDict()
+_shared_types_lock = threading.Lock()
+_MAX_SHARED_TYPES = 1024
+
+
 class DecoderFactory(McapDecoderFactory):
     """Provides functionality to an :py:class:`~mcap.reader.McapReader` to decode protobuf
     messages. Requires valid `protobuf` schemas to decode messages.
+
+    :param max_types: the maximum number of generated message classes this factory keeps. When
+        more schemas than this have been decoded, the least recently used classes are dropped
+        and rebuilt if they are needed again. Setting to ``None`` removes the limit. This only
+        bounds memory use when ``share_descriptor_pool`` is ``False``: with a shared pool, the
+        descriptors stay in the pool and the classes stay in the process-wide cache, so dropping
+        them here only drops this factory's references to them.
+    :param share_descriptor_pool: if ``True``, the files from all schemas are loaded into one
+        descriptor pool, so files common to many schemas are only loaded once, and message classes
+        are also shared with other factories in the process that decode the same schemas. If
+        ``False``, each schema gets its own descriptor pool, which lets the descriptors of dropped
+        message classes be freed as well.
+    :param reuse_messages: if ``True``, each decoder returned by :py:meth:`decoder_for` parses
+        every message into the same message object, rather than allocating a new one. A decoded
+        message is then only valid until the same decoder decodes another message.
     """
 
-    def __init__(self) -> None:
-        self._types: Dict[int, Type[Any]] = {}
+    def __init__(
+        self,
+        max_types: Optional[int] = 1024,
+        share_descriptor_pool: bool = True,
+        reuse_messages: bool = False,
+    ) -> None:
+        self._types: "OrderedDict[int, Type[Any]]" = OrderedDict()
+        self._max_types = max_types
+        self._pool: Optional[DescriptorPool] = (
+            DescriptorPool() if share_descriptor_pool else None
+        )
+        # Message classes may be built on background threads started by warm(), so access to
+        # the types and the descriptor pool is serialized.
+        self._lock = threading.Lock()
+        self._pending: Dict[int, "Future[Type[Any]]"] = {}
+        self._reuse_messages = reuse_messages
 
     def decoder_for(
         self, message_encoding: str, schema: Optional[Schema]
@@ -36,44 +87,209 @@ class DecoderFactory(McapDecoderFactory):
         ):
             return None
 
-        generated = self._types.get(schema.id)
-        if generated is None:
-            fds = FileDescriptorSet.FromString(schema.data)
-            for name, count in Counter(fd.name for fd in fds.file).most_common(1):
-                if count > 1:
-                    raise McapError(
-                        f"FileDescriptorSet contains {count} file descriptors for {name}"
-                    )
+        self._wait_for_pending(schema)
+        message_type = self._get_type(schema)
+        if self._reuse_messages:
+            return _reusing_decoder(message_type())
+        # FromString constructs and parses a message in one call, without a Python frame
+        # of our own per message.
+        return message_type.FromString
+
+    def register_schemas(self, schemas: Iterable[Schema]) -> None:
+        """Builds the message classes for a set of schemas ahead of time, so that
+        :py:meth:`decoder_for` can return a decoder for them without parsing any descriptors.
+        Schemas that are not protobuf-encoded are ignored.
+
+        :param schemas: the schemas to build, eg. the values of
+            :py:attr:`mcap.summary.Summary.schemas`.
+        """
+        for schema in schemas:
+            if schema.encoding == SchemaEncoding.Protobuf:
+                self._wait_for_pending(schema)
+                self._get_type(schema)
+
+    def warm(self, schemas: Iterable[Schema], max_workers: int = 4) -> None:
+        """Starts building the message classes for a set of schemas on background threads, and
+        returns without waiting for them. :py:meth:`decoder_for` waits for a schema's class to be
+        built if it is still in progress. Schemas that are not protobuf-encoded are ignored.
 
+        This does nothing with the pure-Python protobuf implementation, since building classes
+        there holds the GIL and would only compete with reading messages.
+
+        :param schemas: the schemas to build, eg. the values of
+            :py:attr:`mcap.summary.Summary.schemas`.
+        :param max_workers: the maximum number of threads to build message classes with.
+        """
+        if api_implementation.Type() == "python":
+            return
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        for schema in schemas:
+            if (
+                schema.encoding == SchemaEncoding.Protobuf
+                and schema.id not in self._pending
+                and schema.id not in self._types
+            ):
+                self._pending[schema.id] = executor.submit(self._get_type, schema)
+        # let the submitted builds finish in the background.
+        executor.shutdown(wait=False)
+
+    def _wait_for_pending(self, schema: Schema) -> None:
+        pending = self._pending.pop(schema.id, None)
+        if pending is not None:
+            # wait for the build started by warm() rather than starting another one.
+            pending.result()
+
+    def _get_type(self, schema: Schema) -> Type[Any]:
+        with self._lock:
+            generated = self._types.get(schema.id)
+            if generated is not None:
+                self._types.move_to_end(schema.id)
+                return generated
+        if self._pool is None:
+            # classes in the process-wide cache would keep their descriptors alive.
+            generated = self._build_type(schema)
+        else:
+            generated = _get_shared_type(schema, self._build_type)
+        with self._lock:
+            self._types[schema.id] = generated
+            if self._max_types is not None:
+                while len(self._types) > self._max_types:
+                    self._types.popitem(last=False)
+        return generated
+
+    def _build_type(self, schema: Schema) -> Type[Any]:
+        fds = FileDescriptorSet.FromString(schema.data)
+        descriptor: Optional[Descriptor] = None
+        if self._pool is not None:
+            # Only the shared pool is locked, so schemas built in pools of their own are built
+            # in parallel.
+            with self._lock:
+                try:
+                    shared = _add_file_descriptors(self._pool, fds)
+                except TypeError:
+                    # The pool rejected a symbol that _conflicts_with_pool doesn't check, such
+                    # as one nested in another message.
+                    shared = False
+                if shared:
+                    descriptor = _find_message_type(self._pool, schema)
+        if descriptor is None:
+            # Either schemas don't share a pool, or this schema defines a file or symbol
+            # differently to a schema seen earlier, so it can't share their pool.
             pool = DescriptorPool()
-            descriptor_by_name = {fd.name: fd for fd in fds.file}
+            _add_file_descriptors(pool, fds)
+            descriptor = _find_message_type(pool, schema)
+        # Only the class for the schema's own type is built here. Classes for nested
+        # message types are built as they are needed.
+        return GetMessageClass(descriptor)
 
-            def _add(fd: FileDescriptorProto):
-                for dependency in fd.dependency:
-                    if dependency in descriptor_by_name:
-                        _add(descriptor_by_name.pop(dependency))
-                pool.Add(fd)
 
-            while descriptor_by_name:
-                _add(descriptor_by_name.popitem()[1])
+def _get_shared_type(
+    schema: Schema, build_type: Callable[[Schema], Type[Any]]
+) -> Type[Any]:
+    """returns the message class for a schema from the process-wide cache, building it with
+    ``build_type`` if no factory has built it yet."""
+    key = (schema.name, blake2b(schema.data, digest_size=16).digest())
+    with _shared_types_lock:
+        generated = _shared_types.get(key)
+        if generated is not None:
+            _shared_types.move_to_end(key)
+            return generated
+    generated = build_type(schema)
+    with _shared_types_lock:
+        _shared_types[key] = generated
+        while len(_shared_types) > _MAX_SHARED_TYPES:
+            _shared_types.popitem(last=False)
+    return generated
+
+
+def _find_message_type(pool: DescriptorPool, schema: Schema) -> Descriptor:
+    try:
+        return pool.FindMessageTypeByName(schema.name)
+    except KeyError:
+        raise McapError(
+            f"FileDescriptorSet for type {schema.name} is missing that schema"
+        )
 
-            messages = GetMessageClassesForFiles([fd.name for fd in fds.file], pool)
 
-            for name, klass in messages.items():
-                if name == schema.name:
-                    self._types[schema.id] = klass
-                    generated = klass
-        if generated is None:
+def _reusing_decoder(message: Any) -> Callable[[bytes], Any]:
+    """returns a decoder that parses every message into ``message``. ParseFromString clears the
+    message before parsing, so no fields are left over from the previous message."""
+    parse = message.ParseFromString
+
+    def decoder(data: bytes) -> Any:
+        parse(data)
+        return message
+
+    return decoder
+
+
+def _add_file_descriptors(pool: DescriptorPool, fds: FileDescriptorSet) -> bool:
+    """adds the file descriptors in a FileDescriptorSet to a pool, dependencies first. Files
+    already in the pool are skipped. Returns False without adding any files if one of them
+    conflicts with the files already in the pool.
+    """
+    if any(_conflicts_with_pool(pool, fd) for fd in fds.file):
+        return False
+
+    if len(fds.file) == 1:
+        # Many writers emit a single self-contained file per schema, which needs no ordering.
+        _add_file_descriptor(pool, fds.file[0])
+        return True
+
+    descriptor_by_name: Dict[str, FileDescriptorProto] = {}
+    for fd in fds.file:
+        if fd.name in descriptor_by_name:
+            count = sum(1 for other in fds.file if other.name == fd.name)
             raise McapError(
-                f"FileDescriptorSet for type {schema.name} is missing that schema"
+                f"FileDescriptorSet contains {count} file descriptors for {fd.name}"
             )
+        descriptor_by_name[fd.name] = fd
 
-        def decoder(data: bytes) -> Any:
-            proto_msg = generated()
-            proto_msg.ParseFromString(data)
-            return proto_msg
+    def _add(fd: FileDescriptorProto) -> None:
+        for dependency in fd.dependency:
+            if dependency in descriptor_by_name:
+                _add(descriptor_by_name.pop(dependency))
+        _add_file_descriptor(pool, fd)
 
-        return decoder
+    while descriptor_by_name:
+        _add(descriptor_by_name.popitem()[1])
+    return True
+
+
+def _conflicts_with_pool(pool: DescriptorPool, fd: FileDescriptorProto) -> bool:
+    """returns True if the pool already contains a file with the same name as ``fd`` but
+    different contents, or a top-level symbol that ``fd`` also defines in another file.
+    """
+    try:
+        existing = pool.FindFileByName(fd.name)
+    except KeyError:
+        pass
+    else:
+        return existing.serialized_pb != fd.SerializeToString()
+
+    prefix = f"{fd.package}." if fd.package else ""
+    names = [message.name for message in fd.message_type]
+    names.extend(service.name for service in fd.service)
+    names.extend(extension.name for extension in fd.extension)
+    for enum in fd.enum_type:
+        # enum values are scoped alongside their enum, not within it.
+        names.append(enum.name)
+        names.extend(value.name for value in enum.value)
+    for name in names:
+        try:
+            pool.FindFileContainingSymbol(prefix + name)
+        except KeyError:
+            continue
+        return True
+    return False
+
+
+def _add_file_descriptor(pool: DescriptorPool, fd: FileDescriptorProto) -> None:
+    """adds a file descriptor to a pool unless it is already present."""
+    try:
+        pool.FindFileByName(fd.name)
+    except KeyError:
+        pool.Add(fd)
 
 
 class Decoder:
@@ -92,8 +308,14 @@ For similar functionality, instantiate the `mcap.reader.McapReader` with a
             DeprecationWarning,
         )
         self._decoder_factory = DecoderFactory()
+        self._decoders: Dict[int, Callable[[bytes], Any]] = {}
 
     def decode(self, schema: Schema, message: Message) -> Any:
-        decoder = self._decoder_factory.decoder_for(MessageEncoding.Protobuf, schema)
-        assert decoder is not None, "failed to construct a Protobuf decoder"
+        decoder = self._decoders.get(schema.id)
+        if decoder is None:
+            decoder = self._decoder_factory.decoder_for(
+                MessageEncoding.Protobuf, schema
+            )
+            assert decoder is not None, "failed to construct a Protobuf decoder"
+            self._decoders[schema.id] = decoder
         return decoder(message.data)
@@ -15,10 +15,12 @@ from __future__ import annotations
 import warnings
 from datetime import datetime
 from os import PathLike
-from typing import IO, Any, Dict, Iterable, Iterator, Optional, Union
+from typing import IO, Any, Callable, Dict, Iterable, Iterator, Optional, Union
 
+from mcap.exceptions import DecoderNotFoundError
 from mcap.reader import McapReader, make_reader
 from mcap.records import Channel, Message
+from mcap.timestamps import datetime_to_ns, ns_to_datetime
 
 from .decoder import DecoderFactory
 
@@ -53,38 +55,110 @@ def read_protobuf_messages(
         Message records in your MCAP, and decode the protobuf messages with
         the :py:class:`mcap_protobuf.decoder.Decoder` class.
     """
+    return iter(
+        ProtobufMessageReader(
+            source, topics, start_time, end_time, log_time_order, reverse
+        )
+    )
+
+
+class ProtobufMessageReader:
+    """Reads protobuf messages out of an MCAP. The filters are normalized and the decoders are
+    built once, so reading the same source more than once doesn't repeat that work. Iterating an
+    instance yields an McapProtobufMessage for each protobuf message in the MCAP file.
+
+    The parameters are the same as for :py:func:`read_protobuf_messages`. If ``source`` is a
+    stream or an McapReader, it can only be read more than once if it is seekable. Messages are
+    decoded when their ``proto_msg`` is first accessed, except when ``source`` is an McapReader:
+    then messages are decoded as they are read, with that reader's decoder factories.
+    """
 
-    if start_time is not None and isinstance(start_time, datetime):
-        start_time = int(start_time.timestamp() * 1e9)
-    if end_time is not None and isinstance(end_time, datetime):
-        end_time = int(end_time.timestamp() * 1e9)
-
-    fd = None
-    if (
-        isinstance(source, PathLike)
-        or isinstance(source, str)
-        or isinstance(source, bytes)
+    def __init__(
+        self,
+        source: Union[str, bytes, PathLike[str], McapReader, IO[bytes]],
+        topics: Optional[Iterable[str]] = None,
+        start_time: Optional[Union[int, datetime]] = None,
+        end_time: Optional[Union[int, datetime]] = None,
+        log_time_order: bool = True,
+        reverse: bool = False,
     ):
-        fd = open(source, "rb")
-        reader = make_reader(fd, decoder_factories=[DecoderFactory()])
-    elif isinstance(source, McapReader):
-        reader = source
-    else:
-        reader = make_reader(source, decoder_factories=[DecoderFactory()])
-
-    try:
-        for schema, channel, message, proto_msg in reader.iter_decoded_messages(
-            topics, start_time, end_time, log_time_order, reverse
-        ):
-            assert schema is not None
-            yield McapProtobufMessage(
-                proto_msg=proto_msg,
-                message=message,
-                channel=channel,
-            )
-    finally:
-        if fd is not None:
-            fd.close()
+        self._source = source
+        # topics is checked once per message, so it needs to be a set that can be iterated
+        # more than once, not a generator.
+        self._topics = frozenset(topics) if topics is not None else None
+        start_ns: Optional[int] = (
+            datetime_to_ns(start_time)
+            if isinstance(start_time, datetime)
+            else start_time
+        )
+        end_ns: Optional[int] = (
+            datetime_to_ns(end_time) if isinstance(end_time, datetime) else end_time
+        )
+        self._start_time = start_ns
+        self._end_time = end_ns
+        self._log_time_order = log_time_order
+        self._reverse = reverse
+        self._decoder_factory = DecoderFactory()
+        self._decoders: Dict[int, Callable[[bytes], Any]] = {}
+        self._reader: Optional[McapReader] = None
+
+    def __iter__(self) -> Iterator["McapProtobufMessage"]:
+        source = self._source
+        if isinstance(source, McapReader):
+            # A reader supplied by the caller decodes with its own decoder factories.
+            supplied_reader: McapReader = source
+            for _, channel, message, proto_msg in supplied_reader.iter_decoded_messages(
+                self._topics,
+                self._start_time,
+                self._end_time,
+                self._log_time_order,
+                self._reverse,
+            ):
+                yield McapProtobufMessage(proto_msg, message, channel)
+            return
+
+        fd = None
+        if isinstance(source, (str, bytes, PathLike)):
+            fd = open(source, "rb")
+            reader = make_reader(fd)
+        else:
+            # the reader for a stream is kept, since making another would read from wherever the
+            # last iteration left the stream.
+            stream_reader = self._reader
+            if stream_reader is None:
+                stream_reader = self._reader = make_reader(source)
+            reader = stream_reader
+
+        # Messages are decoded when their proto_msg is first accessed, so callers that only look
+        # at message metadata don't pay for decoding.
+        decoders = self._decoders
+        # bound to locals, since they are used once per message.
+        get_decoder = decoders.get
+        message_class = McapProtobufMessage
+        try:
+            for schema, channel, message in reader.iter_messages(
+                self._topics,
+                self._start_time,
+                self._end_time,
+                self._log_time_order,
+                self._reverse,
+            ):
+                assert schema is not None
+                decoder = get_decoder(channel.id)
+                if decoder is None:
+                    decoder = self._decoder_factory.decoder_for(
+                        channel.message_encoding, schema
+                    )
+                    if decoder is None:
+                        raise DecoderNotFoundError(
+                            f"no protobuf decoder for message encoding "
+                            f"{channel.message_encoding}, schema {schema}"
+                        )
+                    decoders[channel.id] = decoder
+                yield message_class(None, message, channel, decoder)
+        finally:
+            if fd is not None:
+                fd.close()
 
 
 class McapProtobufMessage:
@@ -100,21 +174,75 @@ class McapProtobufMessage:
         timestamp.
     """
 
-    def __init__(self, proto_msg: Any, message: Message, channel: Channel):
-        self.proto_msg = proto_msg
+    __slots__ = (
+        "_proto_msg",
+        "_decoder",
+        "_data",
+        "sequence_count",
+        "topic",
+        "channel_metadata",
+        "log_time_ns",
+        "publish_time_ns",
+        "_log_time",
+        "_publish_time",
+    )
+
+    def __init__(
+        self,
+        proto_msg: Any,
+        message: Message,
+        channel: Channel,
+        decoder: Optional[Callable[[bytes], Any]] = None,
+    ):
+        """
+        :param proto_msg: the decoded protobuf message.
+        :param message: the MCAP Message record that contains the protobuf message.
+        :param channel: the MCAP Channel record referenced by the Message record.
+        :param decoder: if not None, ``proto_msg`` is ignored and the message data is decoded
+            with this function when :py:attr:`proto_msg` is first accessed.
+        """
+        self._proto_msg: Any = proto_msg
+        self._decoder = decoder
+        self._data: Optional[bytes] = message.data if decoder is not None else None
         self.sequence_count: int = message.sequence
         self.topic: str = channel.topic
         self.channel_metadata: Dict[str, str] = channel.metadata
 
         self.log_time_ns: int = message.log_time
         self.publish_time_ns: int = message.publish_time
+        self._log_time: Optional[datetime] = None
+        self._publish_time: Optional[datetime] = None
+
+    @property
+    def proto_msg(self) -> Any:
+        """The decoded protobuf message."""
+        if self._decoder is not None:
+            assert self._data is not None
+            self._proto_msg = self._decoder(self._data)
+            self._decoder = None
+            self._data = None
+        return self._proto_msg
+
+    @proto_msg.setter
+    def proto_msg(self, value: Any):
+        self._proto_msg = value
+        self._decoder = None
+        self._data = None
 
     @property
     def log_time(self) -> datetime:
-        """The timestamp representing when this message was logged by the recorder."""
-        return datetime.fromtimestamp(float(self.log_time_ns) / 1e9)
+        """The timestamp representing when this message was logged by the recorder. Built on
+        first access; use ``log_time_ns`` to avoid creating a datetime."""
+        value = self._log_time
+        if value is None:
+            value = self._log_time = ns_to_datetime(self.log_time_ns)
+        return value
 
     @property
     def publish_time(self) -> datetime:
-        """The timestamp representing when this message was published."""
-        return datetime.fromtimestamp(float(self.publish_time_ns) / 1e9)
+        """The timestamp representing when this message was published. Built on first access;
+        use ``publish_time_ns`` to avoid creating a datetime."""
+        value = self._publish_time
+        if value is None:
+            value = self._publish_time = ns_to_datetime(self.publish_time_ns)
+        return value
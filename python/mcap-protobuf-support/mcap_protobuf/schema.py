@@ -1,4 +1,5 @@
-from typing import Any, Set
+from functools import lru_cache
+from typing import Any, Iterator, List, Set, Tuple
 
 from google.protobuf.descriptor import FileDescriptor
 from google.protobuf.descriptor_pb2 import FileDescriptorSet
@@ -7,25 +8,41 @@ from mcap.writer import Writer as McapWriter
 
 
 def register_schema(writer: McapWriter, message_class: Any):
-    file_descriptor_set = build_file_descriptor_set(message_class=message_class)
-
     return writer.register_schema(
         name=message_class.DESCRIPTOR.full_name,
         encoding="protobuf",
-        data=file_descriptor_set.SerializeToString(),
+        data=_serialized_file_descriptor_set(message_class.DESCRIPTOR.file),
     )
 
 
 def build_file_descriptor_set(message_class: Any) -> FileDescriptorSet:
-    file_descriptor_set = FileDescriptorSet()
-    seen_dependencies: Set[str] = set()
+    return _build_file_descriptor_set(message_class.DESCRIPTOR.file)
 
-    def append_file_descriptor(file_descriptor: FileDescriptor):
-        for dep in file_descriptor.dependencies:
+
+def _build_file_descriptor_set(toplevel: FileDescriptor) -> FileDescriptorSet:
+    file_descriptor_set = FileDescriptorSet()
+    seen_dependencies: Set[str] = {toplevel.name}
+    # Depth-first walk with an explicit stack, so deep import chains don't recurse. Each file is
+    # added once, after all of its dependencies.
+    stack: List[Tuple[FileDescriptor, Iterator[FileDescriptor]]] = [
+        (toplevel, iter(toplevel.dependencies))
+    ]
+    while stack:
+        file_descriptor, dependencies = stack[-1]
+        for dep in dependencies:
             if dep.name not in seen_dependencies:
                 seen_dependencies.add(dep.name)
-                append_file_descriptor(dep)
-        file_descriptor.CopyToProto(file_descriptor_set.file.add())
-
-    append_file_descriptor(message_class.DESCRIPTOR.file)
+                stack.append((dep, iter(dep.dependencies)))
+                break
+        else:
+            stack.pop()
+            file_descriptor.CopyToProto(file_descriptor_set.file.add())
     return file_descriptor_set
+
+
+@lru_cache(maxsize=256)
+def _serialized_file_descriptor_set(file_descriptor: FileDescriptor) -> bytes:
+    """returns the serialized FileDescriptorSet for a file and its dependencies. This is shared by
+    all writers in the process, and returns the same bytes object each time a file is requested
+    until it is evicted by more recently used files."""
+    return _build_file_descriptor_set(file_descriptor).SerializeToString()
@@ -1,11 +1,12 @@
-import time
 from io import BufferedWriter
-from typing import IO, Any, Dict, Optional, Tuple, Union
+from time import time_ns
+from typing import IO, Any, Dict, Iterable, Optional, Tuple, Type, Union
 
 import mcap
 from mcap.well_known import MessageEncoding
 from mcap.writer import CompressionType
 from mcap.writer import Writer as McapWriter
+from mcap.writer import iter_message_batch
 
 from . import __version__
 from .schema import register_schema
@@ -36,6 +37,7 @@ class Writer:
             enable_crcs=enable_crcs,
         )
         self._schemas: Dict[str, Tuple[int, str]] = {}
+        self._schemas_by_class: Dict[Type[Any], Tuple[int, str]] = {}
         self._channels: Dict[str, int] = {}
         self._finished = False
         self._writer.start(library=_library_identifier())
@@ -57,27 +59,13 @@ class Writer:
             published.
         :param sequence: an optional sequence count for messages on this topic.
         """
-        msg_typename: str = type(message).DESCRIPTOR.full_name
-        if topic in self._channels:
-            channel_id = self._channels[topic]
-            schema_id, schema_name = self._schemas[topic]
-            if msg_typename != schema_name:
-                raise ValueError(
-                    f"topic '{topic}' has type {schema_name}, cannot write a {msg_typename}"
-                )
-        else:
-            schema_id = register_schema(self._writer, type(message))
-            self._schemas[topic] = (schema_id, msg_typename)
-            channel_id = self._writer.register_channel(
-                topic=topic,
-                message_encoding=MessageEncoding.Protobuf,
-                schema_id=schema_id,
-            )
-            self._channels[topic] = channel_id
-        if log_time is None:
-            log_time = time.time_ns()
-        if publish_time is None:
-            publish_time = time.time_ns()
+        channel_id = self._channel_for(topic, type(message))
+        if log_time is None or publish_time is None:
+            now = time_ns()
+            if log_time is None:
+                log_time = now
+            if publish_time is None:
+                publish_time = now
         self._writer.add_message(
             channel_id=channel_id,
             log_time=log_time,
@@ -86,6 +74,85 @@ class Writer:
             sequence=sequence,
         )
 
+    def write_messages(
+        self,
+        topic: str,
+        messages: Iterable[Any],
+        log_times: Optional[Iterable[Optional[int]]] = None,
+        publish_times: Optional[Iterable[Optional[int]]] = None,
+        sequences: Optional[Iterable[int]] = None,
+    ):
+        """Writes a batch of messages on one topic to an MCAP file. This is equivalent to calling
+        :py:meth:`write_message` for each message, but resolves the topic's channel once for
+        each run of messages with the same type.
+
+        :param topic: the topic that these messages were originally published on.
+        :param messages: the Protobuf objects to write into the MCAP.
+        :param log_times: unix nanosecond timestamps of when each message was written to the MCAP.
+            If given, must yield one value per message.
+        :param publish_times: unix nanosecond timestamps of when each message was originally
+            published. If given, must yield one value per message.
+        :param sequences: optional sequence counts for each message. If given, must yield one value
+            per message.
+        :raises ValueError: if ``log_times``, ``publish_times`` or ``sequences`` yields fewer or
+            more values than there are messages. The messages before the mismatch are written.
+        """
+        add_message = self._writer.add_message
+        channel_id = 0
+        message_class = None
+        for message, log_time, publish_time, sequence in iter_message_batch(
+            messages, log_times, publish_times, sequences
+        ):
+            if type(message) is not message_class:
+                message_class = type(message)
+                channel_id = self._channel_for(topic, message_class)
+            if log_time is None or publish_time is None:
+                now = time_ns()
+                if log_time is None:
+                    log_time = now
+                if publish_time is None:
+                    publish_time = now
+            add_message(
+                channel_id,
+                log_time,
+                message.SerializeToString(),
+                publish_time,
+                sequence,
+            )
+
+    def _channel_for(self, topic: str, message_class: Type[Any]) -> int:
+        """returns the channel ID for a topic, registering the topic's channel and schema if
+        this is the first message on it."""
+        registered = self._schemas_by_class.get(message_class)
+        if topic in self._channels:
+            _, schema_name = self._schemas[topic]
+            msg_typename: str = (
+                registered[1]
+                if registered is not None
+                else message_class.DESCRIPTOR.full_name
+            )
+            if msg_typename != schema_name:
+                raise ValueError(
+                    f"topic '{topic}' has type {schema_name}, cannot write a {msg_typename}"
+                )
+            return self._channels[topic]
+
+        if registered is None:
+            # topics that carry the same message class share one schema.
+            registered = (
+                register_schema(self._writer, message_class),
+                message_class.DESCRIPTOR.full_name,
+            )
+            self._schemas_by_class[message_class] = registered
+        self._schemas[topic] = registered
+        channel_id = self._writer.register_channel(
+            topic=topic,
+            message_encoding=MessageEncoding.Protobuf,
+            schema_id=registered[0],
+        )
+        self._channels[topic] = channel_id
+        return channel_id
+
     def finish(self):
         """Writes the index and footer to the MCAP file."""
         if not self._finished:
@@ -1,5 +1,6 @@
 import os
 import sys
+from collections import deque
 
 from google.protobuf.descriptor_pb2 import FileDescriptorSet
 
@@ -22,16 +23,17 @@ def generate_sample_data_with_disordered_proto_fds(output: IO[Any]):
     schemas with file descriptor sets written in other orders.
     """
     file_descriptor_set = FileDescriptorSet()
-    seen_dependencies: Set[str] = set()
     toplevel = ComplexMessage.DESCRIPTOR.file
-    to_add = {toplevel.name: toplevel}
+    seen_dependencies: Set[str] = {toplevel.name}
+    # a breadth-first walk adds each file before its dependencies.
+    to_add = deque([toplevel])
     while to_add:
-        fd = to_add.popitem()[1]
-        seen_dependencies.add(fd.name)
+        fd = to_add.popleft()
         fd.CopyToProto(file_descriptor_set.file.add())
         for dep in fd.dependencies:
             if dep.name not in seen_dependencies:
-                to_add[dep.name] = dep
+                seen_dependencies.add(dep.name)
+                to_add.append(dep)
 
     writer = McapWriter(output)
     writer.start()
@@ -56,27 +58,31 @@ def generate_sample_data_with_disordered_proto_fds(output: IO[Any]):
 
 
 def generate_sample_data(output: IO[Any]):
+    times = range(1000, 10001, 1000)
     with Writer(output) as writer:
-        for i in range(1, 11):
-            simple_message = SimpleMessage(data=f"Hello MCAP protobuf world #{i}!")
-            writer.write_message(
-                topic="/simple_message",
-                message=simple_message,
-                log_time=i * 1000,
-                publish_time=i * 1000,
-            )
-            complex_message = ComplexMessage(
-                intermediate1=IntermediateMessage1(
-                    simple=SimpleMessage(data=f"Field A {i}")
-                ),
-                intermediate2=IntermediateMessage2(
-                    simple=SimpleMessage(data=f"Field B {i}")
-                ),
-            )
-            writer.write_message(
-                topic="/complex_message",
-                message=complex_message,
-                log_time=i * 1000,
-                publish_time=i * 1000,
-            )
+        writer.write_messages(
+            topic="/simple_message",
+            messages=[
+                SimpleMessage(data=f"Hello MCAP protobuf world #{i}!")
+                for i in range(1, 11)
+            ],
+            log_times=times,
+            publish_times=times,
+        )
+        writer.write_messages(
+            topic="/complex_message",
+            messages=[
+                ComplexMessage(
+                    intermediate1=IntermediateMessage1(
+                        simple=SimpleMessage(data=f"Field A {i}")
+                    ),
+                    intermediate2=IntermediateMessage2(
+                        simple=SimpleMessage(data=f"Field B {i}")
+                    ),
+                )
+                for i in range(1, 11)
+            ],
+            log_times=times,
+            publish_times=times,
+        )
     output.seek(0)
@@ -1,8 +1,17 @@
+import threading
+from collections import defaultdict
 from io import BytesIO
+from typing import Any, Dict, List, Set
 
+import mcap_protobuf.decoder
+import pytest
+from google.protobuf.descriptor_pb2 import FieldDescriptorProto, FileDescriptorSet
+from google.protobuf.message_factory import GetMessageClass
 from mcap_protobuf.decoder import DecoderFactory
 
+from mcap.exceptions import McapError
 from mcap.reader import make_reader
+from mcap.records import Schema
 
 from .generate import (
     generate_sample_data,
@@ -53,5 +62,203 @@ def test_decode_twice():
     decoder_2 = DecoderFactory()
     reader = make_reader(output)
     for schema, _, message in reader.iter_messages():
-        decoder_1.decoder_for("protobuf", schema)(message.data)
-        decoder_2.decoder_for("protobuf", schema)(message.data)
+        proto_msg_1 = decoder_1.decoder_for("protobuf", schema)(message.data)
+        proto_msg_2 = decoder_2.decoder_for("protobuf", schema)(message.data)
+        # the second decoder reuses the message class built by the first.
+        assert type(proto_msg_1) is type(proto_msg_2)
+
+
+def test_register_schemas():
+    output = BytesIO()
+    generate_sample_data(output)
+    reader = make_reader(output)
+    summary = reader.get_summary()
+    assert summary is not None
+
+    decoder = DecoderFactory()
+    decoder.register_schemas(summary.schemas.values())
+    for schema, channel, message in reader.iter_messages():
+        assert schema is not None
+        # registered schemas are not parsed again when a decoder is requested.
+        unparsed = Schema(
+            id=schema.id, data=b"", encoding=schema.encoding, name=schema.name
+        )
+        proto_msg = decoder.decoder_for("protobuf", unparsed)(message.data)
+        if channel.topic == "/simple_message":
+            assert proto_msg.data.startswith("Hello MCAP protobuf world")
+        else:
+            assert proto_msg.intermediate1.simple.data.startswith("Field A")
+
+
+def test_conflicting_file_descriptors():
+    # two schemas may define different versions of a file with the same name.
+    decoder = DecoderFactory()
+    for schema_id, field_type in (
+        (1, FieldDescriptorProto.TYPE_STRING),
+        (2, FieldDescriptorProto.TYPE_INT32),
+    ):
+        fds = FileDescriptorSet()
+        fd = fds.file.add(name="conflict.proto", package="test")
+        fd.message_type.add(name="Msg").field.add(
+            name="value",
+            number=1,
+            type=field_type,
+            label=FieldDescriptorProto.LABEL_OPTIONAL,
+        )
+        schema = Schema(
+            id=schema_id,
+            data=fds.SerializeToString(),
+            encoding="protobuf",
+            name="test.Msg",
+        )
+        msg_class = type(decoder.decoder_for("protobuf", schema)(b""))
+        if field_type == FieldDescriptorProto.TYPE_STRING:
+            assert msg_class(value="a").value == "a"
+        else:
+            assert msg_class(value=1).value == 1
+
+
+def test_same_symbol_in_different_files():
+    # two schemas may define the same message in files with different names.
+    decoder = DecoderFactory()
+    for schema_id, file_name, field_type in (
+        (1, "a.proto", FieldDescriptorProto.TYPE_STRING),
+        (2, "b.proto", FieldDescriptorProto.TYPE_INT32),
+    ):
+        fds = FileDescriptorSet()
+        fds.file.add(name="dep.proto", package="dep").message_type.add(name="Dep")
+        fd = fds.file.add(name=file_name, package="test", dependency=["dep.proto"])
+        fd.message_type.add(name="Msg").field.add(
+            name="value",
+            number=1,
+            type=field_type,
+            label=FieldDescriptorProto.LABEL_OPTIONAL,
+        )
+        schema = Schema(
+            id=schema_id,
+            data=fds.SerializeToString(),
+            encoding="protobuf",
+            name="test.Msg",
+        )
+        msg_class = type(decoder.decoder_for("protobuf", schema)(b""))
+        if field_type == FieldDescriptorProto.TYPE_STRING:
+            assert msg_class(value="a").value == "a"
+        else:
+            assert msg_class(value=1).value == 1
+
+
+def test_duplicate_file_descriptors():
+    fds = FileDescriptorSet()
+    for _ in range(2):
+        fds.file.add(name="dup.proto", package="test").message_type.add(name="Msg")
+    schema = Schema(
+        id=1, data=fds.SerializeToString(), encoding="protobuf", name="test.Msg"
+    )
+    with pytest.raises(McapError, match="contains 2 file descriptors for dup.proto"):
+        DecoderFactory().decoder_for("protobuf", schema)
+
+
+@pytest.mark.parametrize("share_descriptor_pool", [True, False])
+def test_max_types(share_descriptor_pool: bool):
+    output = BytesIO()
+    generate_sample_data(output)
+    decoder = DecoderFactory(max_types=1, share_descriptor_pool=share_descriptor_pool)
+    reader = make_reader(output)
+    count = 0
+    classes: Dict[int, Set[type]] = defaultdict(set)
+    # messages alternate between two schemas, so each decode has to find an evicted class again.
+    for schema, channel, message in reader.iter_messages():
+        proto_msg = decoder.decoder_for("protobuf", schema)(message.data)
+        classes[schema.id].add(type(proto_msg))
+        if channel.topic == "/simple_message":
+            assert proto_msg.data.startswith("Hello MCAP protobuf world")
+        else:
+            assert proto_msg.intermediate1.simple.data.startswith("Field A")
+        count += 1
+    assert count == 20
+    if share_descriptor_pool:
+        # evicted classes are found again in the process-wide cache.
+        assert all(len(types) == 1 for types in classes.values())
+    else:
+        # evicted classes are dropped, so each schema's class was built more than once.
+        assert all(len(types) > 1 for types in classes.values())
+
+
+def test_warm():
+    output = BytesIO()
+    generate_sample_data(output)
+    reader = make_reader(output)
+    summary = reader.get_summary()
+    assert summary is not None
+
+    decoder = DecoderFactory()
+    decoder.warm(summary.schemas.values())
+    count = 0
+    for schema, channel, message in reader.iter_messages():
+        proto_msg = decoder.decoder_for("protobuf", schema)(message.data)
+        if channel.topic == "/simple_message":
+            assert proto_msg.data.startswith("Hello MCAP protobuf world")
+        else:
+            assert proto_msg.intermediate1.simple.data.startswith("Field A")
+        count += 1
+    assert count == 20
+
+
+def test_warm_builds_in_parallel(monkeypatch: pytest.MonkeyPatch):
+    output = BytesIO()
+    generate_sample_data(output)
+    summary = make_reader(output).get_summary()
+    assert summary is not None
+
+    # each build waits for the other, which only finishes if they run at the same time.
+    barrier = threading.Barrier(2, timeout=5)
+
+    def get_message_class(descriptor: Any) -> Any:
+        barrier.wait()
+        return GetMessageClass(descriptor)
+
+    monkeypatch.setattr(mcap_protobuf.decoder, "GetMessageClass", get_message_class)
+    decoder = DecoderFactory(share_descriptor_pool=False)
+    decoder.warm(summary.schemas.values(), max_workers=2)
+    decoder.register_schemas(summary.schemas.values())
+
+
+def test_register_schemas_waits_for_warm(monkeypatch: pytest.MonkeyPatch):
+    output = BytesIO()
+    generate_sample_data(output)
+    summary = make_reader(output).get_summary()
+    assert summary is not None
+
+    built: List[str] = []
+    release = threading.Event()
+
+    def get_message_class(descriptor: Any) -> Any:
+        release.wait(5)
+        built.append(descriptor.full_name)
+        return GetMessageClass(descriptor)
+
+    monkeypatch.setattr(mcap_protobuf.decoder, "GetMessageClass", get_message_class)
+    decoder = DecoderFactory(share_descriptor_pool=False)
+    decoder.warm(summary.schemas.values())
+    threading.Timer(0.1, release.set).start()
+    decoder.register_schemas(summary.schemas.values())
+    for schema in summary.schemas.values():
+        decoder.decoder_for("protobuf", schema)
+    # the schemas being built by warm() were not built again.
+    assert sorted(built) == sorted(schema.name for schema in summary.schemas.values())
+
+
+def test_reuse_messages():
+    output = BytesIO()
+    generate_sample_data(output)
+    reader = make_reader(
+        output, decoder_factories=[DecoderFactory(reuse_messages=True)]
+    )
+    decoded = []
+    for _, _, _, proto_msg in reader.iter_decoded_messages(topics=["/simple_message"]):
+        assert proto_msg.data.startswith("Hello MCAP protobuf world")
+        decoded.append(proto_msg)
+    # every message on the channel was decoded into the same object.
+    assert len(decoded) == 10
+    assert all(proto_msg is decoded[0] for proto_msg in decoded)
+    assert decoded[0].data == "Hello MCAP protobuf world #10!"
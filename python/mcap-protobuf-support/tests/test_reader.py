@@ -0,0 +1,38 @@
+import warnings
+from io import BytesIO
+from typing import Any, Callable, Optional
+
+from mcap.decoder import DecoderFactory as McapDecoderFactory
+from mcap.reader import make_reader
+from mcap.records import Schema
+
+from .generate import generate_sample_data
+
+with warnings.catch_warnings():
+    warnings.simplefilter("ignore", DeprecationWarning)
+    from mcap_protobuf.reader import read_protobuf_messages
+
+
+class _RawDecoderFactory(McapDecoderFactory):
+    def decoder_for(
+        self, message_encoding: str, schema: Optional[Schema]
+    ) -> Optional[Callable[[bytes], Any]]:
+        return bytes
+
+
+def test_read_messages():
+    output = BytesIO()
+    generate_sample_data(output)
+    messages = list(read_protobuf_messages(output))
+    assert len(messages) == 20
+    assert messages[0].proto_msg.data == "Hello MCAP protobuf world #1!"
+
+
+def test_read_messages_with_supplied_reader():
+    # a reader passed in by the caller decodes with its own decoder factories.
+    output = BytesIO()
+    generate_sample_data(output)
+    reader = make_reader(output, decoder_factories=[_RawDecoderFactory()])
+    messages = list(read_protobuf_messages(reader))
+    assert len(messages) == 20
+    assert all(isinstance(message.proto_msg, bytes) for message in messages)
@@ -36,3 +36,46 @@ def test_write_wrong_schema():
         writer.write_message("timestamps", Timestamp(seconds=5, nanos=10))
         with pytest.raises(ValueError):
             writer.write_message("timestamps", Duration(seconds=5, nanos=10))
+
+
+def test_topics_share_schema():
+    io = BytesIO()
+    with Writer(io) as writer:
+        writer.write_message("a", Timestamp(seconds=1), log_time=1)
+        writer.write_message("b", Timestamp(seconds=2), log_time=2)
+    io.seek(0)
+
+    summary = make_reader(io).get_summary()
+    assert summary is not None
+    assert len(summary.schemas) == 1
+    assert [c.schema_id for c in summary.channels.values()] == [1, 1]
+
+
+def test_write_messages():
+    io = BytesIO()
+    with Writer(io) as writer:
+        writer.write_messages(
+            "timestamps",
+            [Timestamp(seconds=i) for i in range(3)],
+            log_times=[10, 20, 30],
+            sequences=[1, 2, 3],
+        )
+        with pytest.raises(ValueError):
+            writer.write_messages("timestamps", [Duration(seconds=5)])
+        with pytest.raises(ValueError, match="one value per message"):
+            writer.write_messages(
+                "timestamps",
+                [Timestamp(seconds=i) for i in range(3, 6)],
+                log_times=[40, 50],
+            )
+        with pytest.raises(ValueError, match="one value per message"):
+            writer.write_messages(
+                "timestamps", [Timestamp(seconds=6)], sequences=[4, 5]
+            )
+    io.seek(0)
+
+    items = list(read_protobuf_messages(io))
+    # the messages before a mismatch are written, but not the one without a log time.
+    assert [m.decoded_message.seconds for m in items] == [0, 1, 2, 3, 4, 6]
+    assert [m.message.log_time for m in items][:5] == [10, 20, 30, 40, 50]
+    assert [m.message.sequence for m in items] == [1, 2, 3, 0, 0, 4]
@@ -1,4 +1,6 @@
+import threading
 import warnings
+from functools import lru_cache
 from typing import Any, Callable, Dict, Optional, Type
 
 try:
@@ -24,10 +26,15 @@ class McapROS1DecodeError(McapError):
 class DecoderFactory(McapDecoderFactory):
     """Provides functionality to an :py:class:`~mcap.reader.McapReader` to decode ROS 1 messages.
     Requires a valid `ros1msg` schema to decode messages.
+
+    :param reuse_messages: if ``True``, messages with the same schema are all deserialized into
+        the same message object, rather than allocating a new one for each. A decoded message is
+        then only valid until another message with its schema is decoded.
     """
 
-    def __init__(self) -> None:
-        self._types: Dict[int, Type[Any]] = {}
+    def __init__(self, reuse_messages: bool = False) -> None:
+        self._decoders: Dict[int, Callable[[bytes], Any]] = {}
+        self._reuse_messages = reuse_messages
 
     def decoder_for(
         self, message_encoding: str, schema: Optional[Schema]
@@ -38,22 +45,55 @@ class DecoderFactory(McapDecoderFactory):
             or schema.encoding != SchemaEncoding.ROS1
         ):
             return None
-        generated_type = self._types.get(schema.id)
-        if generated_type is None:
-            type_dict: Dict[str, Type[Any]] = dynamic.generate_dynamic(  # type: ignore
-                schema.name, schema.data.decode()
-            )
-            generated_type = type_dict[schema.name]
-            self._types[schema.id] = generated_type
-
-        def decoder(data: bytes):
-            ros_msg = generated_type()
-            ros_msg.deserialize(data)
-            return ros_msg
-
+        decoder = self._decoders.get(schema.id)
+        if decoder is None:
+            generated_type = _generate_type(schema.name, schema.data)
+            if self._reuse_messages:
+                decoder = _make_reusing_decoder(generated_type())
+            else:
+                decoder = _make_decoder(generated_type)
+            self._decoders[schema.id] = decoder
         return decoder
 
 
+# generate_dynamic writes each generated module to a temporary directory, appends that to
+# sys.path and imports it, so calls to it are serialized.
+_generate_lock = threading.Lock()
+
+
+@lru_cache(maxsize=1024)
+def _generate_type(name: str, data: bytes) -> Type[Any]:
+    """generates the message class for a schema. Generating a class parses the message
+    definition and execs the generated code, so classes are shared between all decoders in the
+    process that see the same schema."""
+    with _generate_lock:
+        type_dict: Dict[str, Type[Any]] = dynamic.generate_dynamic(  # type: ignore
+            name, data.decode()
+        )
+    return type_dict[name]
+
+
+def _make_decoder(generated_type: Type[Any]) -> Callable[[bytes], Any]:
+    def decoder(data: bytes):
+        ros_msg = generated_type()
+        ros_msg.deserialize(data)
+        return ros_msg
+
+    return decoder
+
+
+def _make_reusing_decoder(ros_msg: Any) -> Callable[[bytes], Any]:
+    # deserialize assigns every field of the message, so none are left over from the previous
+    # message.
+    deserialize = ros_msg.deserialize
+
+    def decoder(data: bytes):
+        deserialize(data)
+        return ros_msg
+
+    return decoder
+
+
 class Decoder:
     """Decodes ROS 1 messages.
 
@@ -70,8 +110,15 @@ For similar functionality, instantiate the :py:class:`mcap.reader.McapReader` wi
             DeprecationWarning,
         )
         self._decoder_factory = DecoderFactory()
+        self._decoders: Dict[int, Callable[[bytes], Any]] = {}
 
     def decode(self, schema: Schema, message: Message) -> Any:
-        decoder = self._decoder_factory.decoder_for(MessageEncoding.ROS1, schema)
-        assert decoder is not None, "failed to construct a ROS1 decoder"
+        decoder = self._decoders.get(schema.id)
+        if decoder is None:
+            decoder = self._decoder_factory.decoder_for(MessageEncoding.ROS1, schema)
+            if decoder is None:
+                raise McapROS1DecodeError(
+                    f"failed to construct a ROS1 decoder for schema {schema.name}"
+                )
+            self._decoders[schema.id] = decoder
         return decoder(message.data)
@@ -17,6 +17,7 @@ from typing import IO, Any, Dict, Iterable, Iterator, Optional, Union
 
 from mcap.reader import McapReader, make_reader
 from mcap.records import Channel, Message, Schema
+from mcap.timestamps import datetime_to_ns, ns_to_datetime
 
 from .decoder import DecoderFactory
 
@@ -58,9 +59,9 @@ def read_ros1_messages(
     """
 
     if start_time is not None and isinstance(start_time, datetime):
-        start_time = int(start_time.timestamp() * 1e9)
+        start_time = datetime_to_ns(start_time)
     if end_time is not None and isinstance(end_time, datetime):
-        end_time = int(end_time.timestamp() * 1e9)
+        end_time = datetime_to_ns(end_time)
 
     fd = None
     if (
@@ -80,9 +81,7 @@ def read_ros1_messages(
             topics, start_time, end_time, log_time_order, reverse
         ):
             assert schema is not None
-            yield McapROS1Message(
-                message=message, channel=channel, schema=schema, ros_msg=ros_msg
-            )
+            yield McapROS1Message(ros_msg, message, channel, schema)
     finally:
         if fd is not None:
             fd.close()
@@ -114,6 +113,8 @@ class McapROS1Message:
         "publish_time_ns",
         "channel",
         "schema",
+        "_log_time",
+        "_publish_time",
     )
 
     def __init__(
@@ -127,13 +128,23 @@ class McapROS1Message:
         self.publish_time_ns: int = message.publish_time
         self.channel: Channel = channel
         self.schema: Schema = schema
+        self._log_time: Optional[datetime] = None
+        self._publish_time: Optional[datetime] = None
 
     @property
     def log_time(self) -> datetime:
-        """The timestamp representing when this message was logged by the recorder."""
-        return datetime.fromtimestamp(float(self.log_time_ns) / 1e9)
+        """The time this message was logged by the recorder, as a local datetime. It is
+        converted from ``log_time_ns`` the first time it is read."""
+        value = self._log_time
+        if value is None:
+            value = self._log_time = ns_to_datetime(self.log_time_ns)
+        return value
 
     @property
     def publish_time(self) -> datetime:
-        """The timestamp representing when this message was published."""
-        return datetime.fromtimestamp(float(self.publish_time_ns) / 1e9)
+        """The time this message was published, as a local datetime. It is converted from
+        ``publish_time_ns`` the first time it is read."""
+        value = self._publish_time
+        if value is None:
+            value = self._publish_time = ns_to_datetime(self.publish_time_ns)
+        return value
@@ -1,10 +1,12 @@
 import time
+from functools import lru_cache
 from io import BufferedWriter, BytesIO
-from typing import IO, Any, Dict, Optional, Union
+from typing import IO, Any, Dict, Iterable, Optional, Type, Union
 
 import mcap
 from mcap.writer import CompressionType
 from mcap.writer import Writer as McapWriter
+from mcap.writer import iter_message_batch
 
 from . import __version__
 
@@ -14,6 +16,13 @@ def _library_identifier():
     return f"mcap-ros1-support {__version__}; mcap {mcap_version}"
 
 
+@lru_cache(maxsize=256)
+def _encode_definition(full_text: str) -> bytes:
+    """encodes a message definition for a schema record. This is shared by all writers in the
+    process, so writers that use the same message types only encode each one once."""
+    return full_text.encode()
+
+
 class Writer:
     def __init__(
         self,
@@ -28,7 +37,10 @@ class Writer:
             compression=compression,
             enable_crcs=enable_crcs,
         )
-        self.__schema_ids: Dict[str, int] = {}
+        # schema ids are looked up by message class, which hashes by identity. Classes that were
+        # generated separately for the same message type share a schema.
+        self.__schema_ids: Dict[Type[Any], int] = {}
+        self.__schema_ids_by_type: Dict[str, int] = {}
         self.__channel_ids: Dict[str, int] = {}
         self.__writer.start(profile="ros1", library=_library_identifier())
         self.__finished = False
@@ -61,23 +73,9 @@ class Writer:
             timestamp. Will default to ``log_time`` if not specified.
         :param sequence: An optional sequence number.
         """
-        if message._type not in self.__schema_ids:
-            schema_id = self.__writer.register_schema(
-                name=message._type,
-                data=message.__class__._full_text.encode(),
-                encoding="ros1msg",
-            )
-            self.__schema_ids[message._type] = schema_id
-        schema_id = self.__schema_ids[message._type]
-
-        if topic not in self.__channel_ids:
-            channel_id = self.__writer.register_channel(
-                topic=topic,
-                message_encoding="ros1",
-                schema_id=schema_id,
-            )
-            self.__channel_ids[topic] = channel_id
-        channel_id = self.__channel_ids[topic]
+        channel_id = self.__channel_ids.get(topic)
+        if channel_id is None:
+            channel_id = self.__register_channel(topic, type(message))
 
         buffer = BytesIO()
         message.serialize(buffer)
@@ -86,13 +84,73 @@ class Writer:
         if publish_time is None:
             publish_time = log_time
         self.__writer.add_message(
-            channel_id=channel_id,
-            log_time=log_time,
-            publish_time=publish_time,
-            sequence=sequence,
-            data=buffer.getvalue(),
+            channel_id, log_time, buffer.getvalue(), publish_time, sequence
         )
 
+    def write_messages(
+        self,
+        topic: str,
+        messages: Iterable[Any],
+        log_times: Optional[Iterable[Optional[int]]] = None,
+        publish_times: Optional[Iterable[Optional[int]]] = None,
+        sequences: Optional[Iterable[int]] = None,
+    ):
+        """
+        Writes a batch of messages on one topic to the MCAP stream. This is equivalent to calling
+        :py:meth:`write_message` for each message, but looks up the topic's channel once.
+
+        :param topic: The topic of the messages.
+        :param messages: The messages to write.
+        :param log_times: The times at which each message was logged as nanosecond UNIX
+            timestamps. If given, must yield one value per message. Messages without a log time
+            default to the current time.
+        :param publish_times: The times at which each message was published as nanosecond UNIX
+            timestamps. If given, must yield one value per message. Messages without a publish
+            time default to their log time.
+        :param sequences: Optional sequence numbers for each message. If given, must yield one
+            value per message.
+        :raises ValueError: If ``log_times``, ``publish_times`` or ``sequences`` yields fewer or
+            more values than there are messages. The messages before the mismatch are written.
+        """
+        add_message = self.__writer.add_message
+        channel_id = self.__channel_ids.get(topic)
+        for message, log_time, publish_time, sequence in iter_message_batch(
+            messages, log_times, publish_times, sequences
+        ):
+            if channel_id is None:
+                channel_id = self.__register_channel(topic, type(message))
+            buffer = BytesIO()
+            message.serialize(buffer)
+            if log_time is None:
+                log_time = time.time_ns()
+            if publish_time is None:
+                publish_time = log_time
+            add_message(channel_id, log_time, buffer.getvalue(), publish_time, sequence)
+
+    def __register_channel(self, topic: str, message_class: Type[Any]) -> int:
+        schema_id = self.__schema_ids.get(message_class)
+        if schema_id is None:
+            schema_id = self.__register_schema(message_class)
+        channel_id = self.__writer.register_channel(
+            topic=topic,
+            message_encoding="ros1",
+            schema_id=schema_id,
+        )
+        self.__channel_ids[topic] = channel_id
+        return channel_id
+
+    def __register_schema(self, message_class: Type[Any]) -> int:
+        schema_id = self.__schema_ids_by_type.get(message_class._type)
+        if schema_id is None:
+            schema_id = self.__writer.register_schema(
+                name=message_class._type,
+                data=_encode_definition(message_class._full_text),
+                encoding="ros1msg",
+            )
+            self.__schema_ids_by_type[message_class._type] = schema_id
+        self.__schema_ids[message_class] = schema_id
+        return schema_id
+
     def __enter__(self):
         return self
 
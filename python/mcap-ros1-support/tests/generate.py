@@ -1,5 +1,5 @@
 import contextlib
-from io import BytesIO
+import struct
 from tempfile import TemporaryFile
 
 from std_msgs.msg import String  # type: ignore
@@ -20,13 +20,12 @@ def generate_sample_data():
     )
 
     for i in range(10):
-        s = String(data=f"string message {i}")
-        buff = BytesIO()
-        s.serialize(buff)  # type: ignore
+        # std_msgs/String is serialized as a length-prefixed UTF-8 string.
+        data = f"string message {i}".encode()
         writer.add_message(
             channel_id=string_channel_id,
             log_time=i * 1000,
-            data=buff.getvalue(),
+            data=struct.pack("<I", len(data)) + data,
             publish_time=i * 1000,
         )
     writer.finish()
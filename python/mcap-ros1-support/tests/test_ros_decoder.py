@@ -14,3 +14,15 @@ def test_ros_decoder():
             assert ros_msg.data == f"string message {index}"
             count += 1
         assert count == 10
+
+
+def test_reuse_messages():
+    with generate_sample_data() as m:
+        reader = make_reader(m, decoder_factories=[DecoderFactory(reuse_messages=True)])
+        decoded = []
+        for index, (_, _, _, ros_msg) in enumerate(reader.iter_decoded_messages()):
+            assert ros_msg.data == f"string message {index}"
+            decoded.append(ros_msg)
+        # every message was deserialized into the same object.
+        assert len(decoded) == 10
+        assert all(ros_msg is decoded[0] for ros_msg in decoded)
@@ -1,5 +1,6 @@
 from io import BytesIO
 
+import pytest
 from mcap_ros1.decoder import DecoderFactory
 from mcap_ros1.writer import Writer as Ros1Writer
 from std_msgs.msg import String  # type: ignore
@@ -24,3 +25,41 @@ def test_write_messages():
         assert msg.channel.topic == "/chatter"
         assert msg.decoded_message.data == f"string message {index}"
         assert msg.message.log_time == index
+
+
+def test_write_messages_batch():
+    output = BytesIO()
+    ros_writer = Ros1Writer(output=output)
+    ros_writer.write_messages(
+        "/chatter",
+        [String(data=f"string message {i}") for i in range(0, 10)],
+        log_times=range(0, 10),
+        sequences=range(1, 11),
+    )
+    ros_writer.finish()
+
+    output.seek(0)
+    for index, msg in enumerate(read_ros1_messages(output)):
+        assert msg.channel.topic == "/chatter"
+        assert msg.decoded_message.data == f"string message {index}"
+        assert msg.message.log_time == index
+        assert msg.message.publish_time == index
+        assert msg.message.sequence == index + 1
+
+
+def test_write_messages_batch_length_mismatch():
+    output = BytesIO()
+    ros_writer = Ros1Writer(output=output)
+    with pytest.raises(ValueError, match="one value per message"):
+        ros_writer.write_messages(
+            "/chatter",
+            [String(data=f"string message {i}") for i in range(0, 3)],
+            publish_times=[0, 1],
+        )
+    ros_writer.finish()
+
+    output.seek(0)
+    assert [msg.decoded_message.data for msg in read_ros1_messages(output)] == [
+        "string message 0",
+        "string message 1",
+    ]
@@ -2,8 +2,9 @@
 
 import struct
 from enum import IntEnum
+from functools import lru_cache
 from io import BufferedWriter
-from typing import Any, BinaryIO, Callable, List, Tuple, Union
+from typing import Any, BinaryIO, Callable, List, Union
 
 
 class EncapsulationKind(IntEnum):
@@ -56,10 +57,29 @@ pack_float64be = struct.Struct(">d").pack
 pack_float64le = struct.Struct("<d").pack
 
 
+@lru_cache(maxsize=256)
+def _array_struct(little_endian: bool, code: str, length: int) -> struct.Struct:
+    # Arrays of the same type and length recur from message to message. The struct module's
+    # own cache of parsed formats is cleared entirely once it holds 100 of them
+    return struct.Struct(f"{'<' if little_endian else '>'}{length}{code}")
+
+
 class CdrReader:
     """Parses values from CDR data."""
 
-    __slots__ = ("data", "offset", "little_endian")
+    __slots__ = (
+        "data",
+        "offset",
+        "little_endian",
+        "_unpack_int16",
+        "_unpack_uint16",
+        "_unpack_int32",
+        "_unpack_uint32",
+        "_unpack_int64",
+        "_unpack_uint64",
+        "_unpack_float32",
+        "_unpack_float64",
+    )
 
     def __init__(self, data: bytes):
         """Create a CdrReader wrapping a byte array."""
@@ -70,7 +90,26 @@ class CdrReader:
         kind = unpack_uint8(data, 1)[0]
         self.data = data
         self.offset = 4
-        self.little_endian = kind & 1 == 1
+        self.little_endian = little_endian = kind & 1 == 1
+        # Select the unpack function for each type once, rather than on every read
+        if little_endian:
+            self._unpack_int16 = unpack_int16le
+            self._unpack_uint16 = unpack_uint16le
+            self._unpack_int32 = unpack_int32le
+            self._unpack_uint32 = unpack_uint32le
+            self._unpack_int64 = unpack_int64le
+            self._unpack_uint64 = unpack_uint64le
+            self._unpack_float32 = unpack_float32le
+            self._unpack_float64 = unpack_float64le
+        else:
+            self._unpack_int16 = unpack_int16be
+            self._unpack_uint16 = unpack_uint16be
+            self._unpack_int32 = unpack_int32be
+            self._unpack_uint32 = unpack_uint32be
+            self._unpack_int64 = unpack_int64be
+            self._unpack_uint64 = unpack_uint64be
+            self._unpack_float32 = unpack_float32be
+            self._unpack_float64 = unpack_float64be
 
     def kind(self) -> EncapsulationKind:
         """Return the encapsulation kind of the CDR data."""
@@ -86,87 +125,111 @@ class CdrReader:
 
     def boolean(self) -> bool:
         """Read an 8-bit value and interpret it as a boolean."""
-        return self.uint8() != 0
+        offset = self.offset
+        self.offset = offset + 1
+        return self.data[offset] != 0
 
     def int8(self) -> int:
         """Read a signed 8-bit integer."""
-        return self._unpack(unpack_int8, size=1)
+        value = unpack_int8(self.data, self.offset)[0]
+        self.offset += 1
+        return value
 
     def uint8(self) -> int:
         """Read an unsigned 8-bit integer."""
-        return self._unpack(unpack_uint8, size=1)
+        offset = self.offset
+        self.offset = offset + 1
+        return self.data[offset]
 
     def int16(self) -> int:
         """Read a signed 16-bit integer."""
-        return self._unpack(
-            unpack_int16le if self.little_endian else unpack_int16be, size=2
-        )
+        offset = (self.offset + 1) & -2
+        value = self._unpack_int16(self.data, offset)[0]
+        self.offset = offset + 2
+        return value
 
     def uint16(self) -> int:
         """Read an unsigned 16-bit integer."""
-        return self._unpack(
-            unpack_uint16le if self.little_endian else unpack_uint16be, size=2
-        )
+        offset = (self.offset + 1) & -2
+        value = self._unpack_uint16(self.data, offset)[0]
+        self.offset = offset + 2
+        return value
 
     def int32(self) -> int:
         """Read a signed 32-bit integer."""
-        return self._unpack(
-            unpack_int32le if self.little_endian else unpack_int32be, size=4
-        )
+        offset = (self.offset + 3) & -4
+        value = self._unpack_int32(self.data, offset)[0]
+        self.offset = offset + 4
+        return value
 
     def uint32(self) -> int:
         """Read an unsigned 32-bit integer."""
-        return self._unpack(
-            unpack_uint32le if self.little_endian else unpack_uint32be, size=4
-        )
+        offset = (self.offset + 3) & -4
+        value = self._unpack_uint32(self.data, offset)[0]
+        self.offset = offset + 4
+        return value
 
     def int64(self) -> int:
         """Read a signed 64-bit integer."""
-        return self._unpack(
-            unpack_int64le if self.little_endian else unpack_int64be, size=8
-        )
+        offset = ((self.offset + 3) & -8) + 4
+        value = self._unpack_int64(self.data, offset)[0]
+        self.offset = offset + 8
+        return value
 
     def uint64(self) -> int:
         """Read an unsigned 64-bit integer."""
-        return self._unpack(
-            unpack_uint64le if self.little_endian else unpack_uint64be, size=8
-        )
+        offset = ((self.offset + 3) & -8) + 4
+        value = self._unpack_uint64(self.data, offset)[0]
+        self.offset = offset + 8
+        return value
 
     def uint16BE(self) -> int:
         """Read an unsigned big-endian 16-bit integer."""
-        return self._unpack(unpack_uint16be, size=2)
+        offset = (self.offset + 1) & -2
+        value = unpack_uint16be(self.data, offset)[0]
+        self.offset = offset + 2
+        return value
 
     def uint32BE(self) -> int:
         """Read an unsigned big-endian 32-bit integer."""
-        return self._unpack(unpack_uint32be, size=4)
+        offset = (self.offset + 3) & -4
+        value = unpack_uint32be(self.data, offset)[0]
+        self.offset = offset + 4
+        return value
 
     def uint64BE(self) -> int:
         """Read an unsigned big-endian 64-bit integer."""
-        return self._unpack(unpack_uint64be, size=8)
+        offset = ((self.offset + 3) & -8) + 4
+        value = unpack_uint64be(self.data, offset)[0]
+        self.offset = offset + 8
+        return value
 
     def float32(self) -> float:
         """Read a 32-bit floating point number."""
-        return self._unpack(
-            unpack_float32le if self.little_endian else unpack_float32be, size=4
-        )
+        offset = (self.offset + 3) & -4
+        value = self._unpack_float32(self.data, offset)[0]
+        self.offset = offset + 4
+        return value
 
     def float64(self) -> float:
         """Read a 64-bit floating point number."""
-        return self._unpack(
-            unpack_float64le if self.little_endian else unpack_float64be, size=8
-        )
+        offset = ((self.offset + 3) & -8) + 4
+        value = self._unpack_float64(self.data, offset)[0]
+        self.offset = offset + 8
+        return value
 
     def string(self) -> str:
         """Read a string prefixed with its 32-bit length."""
-        length = self.uint32()
+        offset = (self.offset + 3) & -4
+        length = self._unpack_uint32(self.data, offset)[0]
+        offset += 4
+        self.offset = offset + length
         if length <= 1:
             # CDR strings are null-terminated, but serializers differ on whether
             # empty strings are length 0 or 1
-            self.offset += length
             return ""
-        value = self.string_raw(length - 1)
-        self.offset += 1  # Skip null terminator
-        return value
+        # Decode the bytes before the null terminator straight from the slice
+        return self.data[offset : offset + length - 1].decode("utf-8")
 
     def string_raw(self, length: int) -> str:
         """Read a string of the given length."""
@@ -180,11 +243,11 @@ class CdrReader:
 
     def boolean_array(self, length: int) -> List[bool]:
         """Read an array of booleans of the given length."""
-        return [self.uint8() != 0 for _ in range(length)]
+        return self._unpack_array("?", 1, length)
 
     def int8_array(self, length: int) -> List[int]:
         """Read an array of signed 8-bit integers of the given length."""
-        return [self.int8() for _ in range(length)]
+        return self._unpack_array("b", 1, length)
 
     def uint8_array(self, length: int) -> bytes:
         """Read a byte array of the given length."""
@@ -194,35 +257,35 @@ class CdrReader:
 
     def int16_array(self, length: int) -> List[int]:
         """Read an array of signed 16-bit integers of the given length."""
-        return [self.int16() for _ in range(length)]
+        return self._unpack_array("h", 2, length)
 
     def uint16_array(self, length: int) -> List[int]:
         """Read an array of unsigned 16-bit integers of the given length."""
-        return [self.uint16() for _ in range(length)]
+        return self._unpack_array("H", 2, length)
 
     def int32_array(self, length: int) -> List[int]:
         """Read an array of signed 32-bit integers of the given length."""
-        return [self.int32() for _ in range(length)]
+        return self._unpack_array("i", 4, length)
 
     def uint32_array(self, length: int) -> List[int]:
         """Read an array of unsigned 32-bit integers of the given length."""
-        return [self.uint32() for _ in range(length)]
+        return self._unpack_array("I", 4, length)
 
     def int64_array(self, length: int) -> List[int]:
         """Read an array of signed 64-bit integers of the given length."""
-        return [self.int64() for _ in range(length)]
+        return self._unpack_array("q", 8, length)
 
     def uint64_array(self, length: int) -> List[int]:
         """Read an array of unsigned 64-bit integers of the given length."""
-        return [self.uint64() for _ in range(length)]
+        return self._unpack_array("Q", 8, length)
 
     def float32_array(self, length: int) -> List[float]:
         """Read an array of 32-bit floating point numbers of the given length."""
-        return [self.float32() for _ in range(length)]
+        return self._unpack_array("f", 4, length)
 
     def float64_array(self, length: int) -> List[float]:
         """Read an array of 64-bit floating point numbers of the given length."""
-        return [self.float64() for _ in range(length)]
+        return self._unpack_array("d", 8, length)
 
     def string_array(self, length: int) -> List[str]:
         """Read an array of strings of the given length."""
@@ -246,22 +309,39 @@ class CdrReader:
         self.offset = offset
 
     def _align(self, size: int):
-        alignment = (self.offset - 4) % size
-        if alignment > 0:
-            self.offset += size - alignment
-
-    def _unpack(self, fn: Callable[[bytes, int], Tuple[Any]], size: int):
-        if size > 1:
-            self._align(size)
-        value = fn(self.data, self.offset)[0]
-        self.offset += size
-        return value
+        # Sizes are powers of two, so rounding up is a mask. Alignment is relative to the end of
+        # the 4-byte header, which the scalar readers inline as a mask of the absolute offset
+        self.offset = ((self.offset - 4 + size - 1) & -size) + 4
+
+    def _unpack_array(self, code: str, size: int, length: int) -> List[Any]:
+        # Unpack the whole array in one call. Only the first element can need alignment, and
+        # an empty array is not aligned at all
+        if length == 0:
+            return []
+        self._align(size)
+        values = _array_struct(self.little_endian, code, length).unpack_from(
+            self.data, self.offset
+        )
+        self.offset += size * length
+        return list(values)
 
 
 class CdrWriter:
     """Serialize CDR data."""
 
-    __slots__ = ("little_endian", "output", "offset")
+    __slots__ = (
+        "little_endian",
+        "output",
+        "offset",
+        "_pack_int16",
+        "_pack_uint16",
+        "_pack_int32",
+        "_pack_uint32",
+        "_pack_int64",
+        "_pack_uint64",
+        "_pack_float32",
+        "_pack_float64",
+    )
 
     little_endian: bool
     output: Union[BinaryIO, BufferedWriter]
@@ -273,9 +353,28 @@ class CdrWriter:
         kind: EncapsulationKind = EncapsulationKind.CDR_LE,
     ):
         """Initialize a CdrWriter wrapping a writable output and write the CDR header."""
-        self.little_endian = kind & 1 == 1
+        self.little_endian = little_endian = kind & 1 == 1
         self.output = output
         self.offset = 0
+        # Select the pack function for each type once, rather than on every write
+        if little_endian:
+            self._pack_int16 = pack_int16le
+            self._pack_uint16 = pack_uint16le
+            self._pack_int32 = pack_int32le
+            self._pack_uint32 = pack_uint32le
+            self._pack_int64 = pack_int64le
+            self._pack_uint64 = pack_uint64le
+            self._pack_float32 = pack_float32le
+            self._pack_float64 = pack_float64le
+        else:
+            self._pack_int16 = pack_int16be
+            self._pack_uint16 = pack_uint16be
+            self._pack_int32 = pack_int32be
+            self._pack_uint32 = pack_uint32be
+            self._pack_int64 = pack_int64be
+            self._pack_uint64 = pack_uint64be
+            self._pack_float32 = pack_float32be
+            self._pack_float64 = pack_float64be
         # Write the CDR header
         self.write_uint16BE(kind)
         self.write_uint16BE(0)
@@ -294,33 +393,27 @@ class CdrWriter:
 
     def write_int16(self, value: int):
         """Write a signed 16-bit integer."""
-        self._pack(pack_int16le if self.little_endian else pack_int16be, value, size=2)
+        self._pack(self._pack_int16, value, size=2)
 
     def write_uint16(self, value: int):
         """Write an unsigned 16-bit integer."""
-        self._pack(
-            pack_uint16le if self.little_endian else pack_uint16be, value, size=2
-        )
+        self._pack(self._pack_uint16, value, size=2)
 
     def write_int32(self, value: int):
         """Write a signed 32-bit integer."""
-        self._pack(pack_int32le if self.little_endian else pack_int32be, value, size=4)
+        self._pack(self._pack_int32, value, size=4)
 
     def write_uint32(self, value: int):
         """Write an unsigned 32-bit integer."""
-        self._pack(
-            pack_uint32le if self.little_endian else pack_uint32be, value, size=4
-        )
+        self._pack(self._pack_uint32, value, size=4)
 
     def write_int64(self, value: int):
         """Write a signed 64-bit integer."""
-        self._pack(pack_int64le if self.little_endian else pack_int64be, value, size=8)
+        self._pack(self._pack_int64, value, size=8)
 
     def write_uint64(self, value: int):
         """Write an unsigned 64-bit integer."""
-        self._pack(
-            pack_uint64le if self.little_endian else pack_uint64be, value, size=8
-        )
+        self._pack(self._pack_uint64, value, size=8)
 
     def write_uint16BE(self, value: int):
         """Write an unsigned 16-bit integer in big endian."""
@@ -336,15 +429,11 @@ class CdrWriter:
 
     def write_float32(self, value: float):
         """Write a 32-bit floating point number."""
-        self._pack(
-            pack_float32le if self.little_endian else pack_float32be, value, size=4
-        )
+        self._pack(self._pack_float32, value, size=4)
 
     def write_float64(self, value: float):
         """Write a 64-bit floating point number."""
-        self._pack(
-            pack_float64le if self.little_endian else pack_float64be, value, size=8
-        )
+        self._pack(self._pack_float64, value, size=8)
 
     def write_string(self, value: str):
         """Write a string prefixed with its 32-bit length."""
@@ -359,66 +448,73 @@ class CdrWriter:
         self.output.write(value)
         self.offset += len(value)
 
+    def write_zeros(self, count: int):
+        """Write `count` zero bytes. Nothing is written if `count` is not positive."""
+        if count > 0:
+            self.output.write(bytes(count))
+            self.offset += count
+
     def write_boolean_array(self, values: List[bool]):
         """Write an array of booleans."""
-        for value in values:
-            self.write_boolean(value)
+        self._pack_array("?", values, size=1)
 
     def write_int8_array(self, values: List[int]):
         """Write an array of signed 8-bit integers."""
-        for value in values:
-            self.write_int8(value)
+        self._pack_array("b", values, size=1)
 
     def write_uint8_array(self, values: List[int]):
         """Write an array of unsigned 8-bit integers."""
-        for value in values:
-            self.write_uint8(value)
+        self._pack_array("B", values, size=1)
 
     def write_int16_array(self, values: List[int]):
         """Write an array of signed 16-bit integers."""
-        for value in values:
-            self.write_int16(value)
+        self._pack_array("h", values, size=2)
 
     def write_uint16_array(self, values: List[int]):
         """Write an array of unsigned 16-bit integers."""
-        for value in values:
-            self.write_uint16(value)
+        self._pack_array("H", values, size=2)
 
     def write_int32_array(self, values: List[int]):
         """Write an array of signed 32-bit integers."""
-        for value in values:
-            self.write_int32(value)
+        self._pack_array("i", values, size=4)
 
     def write_uint32_array(self, values: List[int]):
         """Write an array of unsigned 32-bit integers."""
-        for value in values:
-            self.write_uint32(value)
+        self._pack_array("I", values, size=4)
 
     def write_int64_array(self, values: List[int]):
         """Write an array of signed 64-bit integers."""
-        for value in values:
-            self.write_int64(value)
+        self._pack_array("q", values, size=8)
 
     def write_uint64_array(self, values: List[int]):
         """Write an array of unsigned 64-bit integers."""
-        for value in values:
-            self.write_uint64(value)
+        self._pack_array("Q", values, size=8)
 
     def write_float32_array(self, values: List[float]):
         """Write an array of 32-bit floating point numbers."""
-        for value in values:
-            self.write_float32(value)
+        self._pack_array("f", values, size=4)
 
     def write_float64_array(self, values: List[float]):
         """Write an array of 64-bit floating point numbers."""
-        for value in values:
-            self.write_float64(value)
+        self._pack_array("d", values, size=8)
 
     def write_string_array(self, values: List[str]):
         """Write an array of strings, each prefixed with their 32-bit length."""
         for value in values:
             self.write_string(value)
 
+    def _pack_array(self, code: str, values: List[Any], size: int):
+        # Pack the whole array in one write. Only the first element can need alignment, and
+        # an empty array is not aligned at all
+        if len(values) == 0:
+            return
+        if size > 1:
+            self._align(size)
+        self.output.write(
+            _array_struct(self.little_endian, code, len(values)).pack(*values)
+        )
+        self.offset += size * len(values)
+
     def _pack(self, fn: Callable[[Any], bytes], value: Any, size: int):
         if size > 1:
             self._align(size)
@@ -427,8 +523,7 @@ class CdrWriter:
 
     def _align(self, size: int):
         # The four byte header is not considered for alignment
-        alignment = (self.offset - 4) % size
-        padding = size - alignment if alignment > 0 else 0
+        padding = (4 - self.offset) & (size - 1)
         if padding > 0:
             self.output.write(b"\0" * padding)
             self.offset += padding
@@ -1,9 +1,12 @@
 """ROS2 message definition parsing and message deserialization."""
 
+import array as py_array
+import keyword
 import re
+import struct
+from functools import lru_cache, partial
 from io import BytesIO
-from types import SimpleNamespace
-from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
 
 from ._cdr import CdrReader, CdrWriter
 from ._vendor.rosidl_adapter.parser import (
@@ -15,7 +18,7 @@ from ._vendor.rosidl_adapter.parser import (
 
 # cSpell:words ftype wstring msgdefs
 
-DecodedMessage = SimpleNamespace
+DecodedMessage = Any
 DecoderFunction = Callable[[bytes], DecodedMessage]
 EncoderFunction = Callable[[Any], bytes]
 PrimitiveValue = Union[bool, int, float, str]
@@ -110,21 +113,67 @@ ARRAY_WRITERS = {
     "wstring": _writeWstringArray,
 }
 
-STRING_TYPES = ("string", "wstring")
-FLOAT_TYPES = ("float32", "float64")
-INT_TYPES = (
-    "byte",
-    "char",
-    "int8",
-    "uint8",
-    "int16",
-    "uint16",
-    "int32",
-    "uint32",
-    "int64",
-    "uint64",
+# struct format codes and sizes of the primitive types with a fixed size
+FIXED_SIZE_FORMATS = {
+    "bool": ("?", 1),
+    "byte": ("B", 1),
+    "char": ("b", 1),
+    "float32": ("f", 4),
+    "float64": ("d", 8),
+    "int8": ("b", 1),
+    "uint8": ("B", 1),
+    "int16": ("h", 2),
+    "uint16": ("H", 2),
+    "int32": ("i", 4),
+    "uint32": ("I", 4),
+    "int64": ("q", 8),
+    "uint64": ("Q", 8),
+}
+
+# Expressions for the offset aligned to each size, relative to the 4-byte CDR header
+ALIGNED_OFFSETS = {
+    2: "(offset + 1) & -2",
+    4: "(offset + 3) & -4",
+    8: "((offset + 3) & -8) + 4",
+}
+
+# Array types that are read and written as bytes objects
+BYTE_ARRAY_TYPES = frozenset(("byte", "uint8"))
+
+STRING_TYPES = frozenset(("string", "wstring"))
+FLOAT_TYPES = frozenset(("float32", "float64"))
+INT_TYPES = frozenset(
+    (
+        "byte",
+        "char",
+        "int8",
+        "uint8",
+        "int16",
+        "uint16",
+        "int32",
+        "uint32",
+        "int64",
+        "uint64",
+    )
 )
 
+# The conversion applied to values of each primitive type when encoding. Called without a
+# value, each returns the type's zero value
+PRIMITIVE_CASTS: Dict[str, Callable[..., PrimitiveValue]] = {
+    **dict.fromkeys(STRING_TYPES, str),
+    **dict.fromkeys(FLOAT_TYPES, float),
+    **dict.fromkeys(INT_TYPES, int),
+    "bool": bool,
+}
+
+# Separates the definitions in a concatenated schema
+SEPARATOR_PATTERN = re.compile(r"^={3,}$", re.MULTILINE)
+# The "MSG: pkg_name/msg_name" line that names each nested definition
+MSG_NAME_PATTERN = re.compile(r"^MSG:\s+(\S+)$", re.MULTILINE)
+
+# The field that ROS 2 adds to empty messages, whose value is read and discarded
+EMPTY_MESSAGE_FIELD = Field(Type("uint8"), "structure_needs_at_least_one_member")
+
 TimeDefinition = MessageSpecification(
     "builtin_interfaces",
     "Time",
@@ -142,11 +191,19 @@ def generate_dynamic(schema_name: str, schema_text: str) -> Dict[str, DecoderFun
     :param schema_text: The schema text to use for deserializing the message payload.
     :return: A dictionary mapping schema names to message parser.
     """
+    # The cached dictionary is shared, so callers get their own copy of it
+    return dict(_generate_dynamic(schema_name, schema_text))
+
+
+@lru_cache(maxsize=256)
+def _generate_dynamic(schema_name: str, schema_text: str) -> Dict[str, DecoderFunction]:
+    # Files from the same system contain the same schemas, so the parsed definitions and
+    # generated functions are shared between calls with the same schema
     msgdefs: Dict[str, MessageSpecification] = {
         "builtin_interfaces/Time": TimeDefinition,
         "builtin_interfaces/Duration": TimeDefinition,
     }
-    decoders: Dict[str, DecoderFunction] = {}
+    schema_names: List[Tuple[str, str]] = []
 
     def handle_msgdef(
         cur_schema_name: str, short_name: str, msgdef: MessageSpecification
@@ -154,13 +211,28 @@ def generate_dynamic(schema_name: str, schema_text: str) -> Dict[str, DecoderFun
         # Add the message definition to the dictionary
         msgdefs[cur_schema_name] = msgdef
         msgdefs[short_name] = msgdef
+        schema_names.append((cur_schema_name, short_name))
+
+    _for_each_msgdef(schema_name, schema_text, handle_msgdef)
+
+    # Nested message definitions follow the definitions that use them, so the decoders are
+    # generated once every definition is known
+    codegen = _ReaderCodegen(msgdefs)
+    read_fn_names = {
+        cur_schema_name: codegen.function_for(msgdefs[cur_schema_name], top_level=True)
+        for cur_schema_name, _ in schema_names
+    }
+    namespace = codegen.compile(f"<mcap_ros2:{schema_name}>")
 
-        # Add the message decoder to the dictionary
-        decoder: DecoderFunction = _make_read_message(cur_schema_name, msgdefs)
+    # Add the message decoders to the dictionary
+    decoders: Dict[str, DecoderFunction] = {}
+    for cur_schema_name, short_name in schema_names:
+        read_fn_name = read_fn_names[cur_schema_name]
+        decoder = _make_decoder(
+            namespace[f"{read_fn_name}_le"], namespace[f"{read_fn_name}_be"]
+        )
         decoders[cur_schema_name] = decoder
         decoders[short_name] = decoder
-
-    _for_each_msgdef(schema_name, schema_text, handle_msgdef)
     return decoders
 
 
@@ -171,6 +243,16 @@ def serialize_dynamic(schema_name: str, schema_text: str) -> Dict[str, EncoderFu
     :param schema_text: The schema text to use for serializing message payloads.
     :return: A dictionary mapping schema names to message encoders.
     """
+    # The cached dictionary is shared, so callers get their own copy of it
+    return dict(_serialize_dynamic(schema_name, schema_text))
+
+
+@lru_cache(maxsize=256)
+def _serialize_dynamic(
+    schema_name: str, schema_text: str
+) -> Dict[str, EncoderFunction]:
+    # Files from the same system contain the same schemas, so the parsed definitions and
+    # generated functions are shared between calls with the same schema
     msgdefs: Dict[str, MessageSpecification] = {
         "builtin_interfaces/Time": TimeDefinition,
         "builtin_interfaces/Duration": TimeDefinition,
@@ -190,6 +272,7 @@ def serialize_dynamic(schema_name: str, schema_text: str) -> Dict[str, EncoderFu
         encoders[short_name] = encoder
 
     _for_each_msgdef(schema_name, schema_text, handle_msgdef)
+    _resolve_nested_definitions(msgdefs)
     return encoders
 
 
@@ -205,11 +288,9 @@ def read_message(
     :param data: The message payload to deserialize.
     :return: The deserialized message.
     """
-    msgdef = msgdefs.get(schema_name)
-    if msgdef is None:
+    if schema_name not in msgdefs:
         raise ValueError(f'Message definition not found for "{schema_name}"')
-    reader = CdrReader(data)
-    return _read_complex_type(msgdef, msgdefs, reader)
+    return _read_message_decoder(schema_name, _MessageDefinitions(msgdefs))(data)
 
 
 def encode_message(
@@ -233,10 +314,48 @@ def encode_message(
     return output.getvalue()
 
 
-def _make_read_message(
-    schema_name: str, msgdefs: Dict[str, MessageSpecification]
+class _MessageDefinitions:
+    """A snapshot of a message definitions dictionary that can key a cache. Definitions are
+    compared by identity, and the snapshot keeps them alive while it is cached."""
+
+    __slots__ = ("msgdefs", "_key")
+
+    def __init__(self, msgdefs: Dict[str, MessageSpecification]):
+        self.msgdefs = dict(msgdefs)
+        self._key = tuple((name, id(msgdef)) for name, msgdef in self.msgdefs.items())
+
+    def __hash__(self) -> int:
+        return hash(self._key)
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, _MessageDefinitions) and self._key == other._key
+
+
+@lru_cache(maxsize=256)
+def _read_message_decoder(
+    schema_name: str, definitions: _MessageDefinitions
+) -> DecoderFunction:
+    # Callers of read_message usually pass the same definitions for every message, so the
+    # decoder is generated once for them
+    codegen = _ReaderCodegen(definitions.msgdefs)
+    read_fn_name = codegen.function_for(
+        definitions.msgdefs[schema_name], top_level=True
+    )
+    namespace = codegen.compile(f"<mcap_ros2:{schema_name}>")
+    return _make_decoder(
+        namespace[f"{read_fn_name}_le"], namespace[f"{read_fn_name}_be"]
+    )
+
+
+def _make_decoder(
+    read_le: Callable[[CdrReader], DecodedMessage],
+    read_be: Callable[[CdrReader], DecodedMessage],
 ) -> DecoderFunction:
-    return lambda data: read_message(schema_name, msgdefs, data)
+    def decoder(data: bytes) -> DecodedMessage:
+        reader = CdrReader(data)
+        return (read_le if reader.little_endian else read_be)(reader)
+
+    return decoder
 
 
 def _make_encode_message(
@@ -245,94 +364,452 @@ def _make_encode_message(
     return lambda msg: encode_message(schema_name, msgdefs, msg)
 
 
-def _read_complex_type(
-    msgdef: MessageSpecification,
-    msgdefs: Dict[str, MessageSpecification],
-    reader: CdrReader,
-) -> DecodedMessage:
-    Msg = type(
-        msgdef.msg_name,
-        (SimpleNamespace,),
-        {
-            "__name__": msgdef.msg_name,
-            "__slots__": [field.name for field in msgdef.fields],
-            "__repr__": __repr__,
-            "__str__": __repr__,
-            "__eq__": __eq__,
-            "__ne__": __ne__,
-            "_type": str(msgdef.base_type),
-            "_full_text": str(msgdef),
-        },
-    )
-    msg = Msg()
+class _ReaderCodegen:
+    """Generates the source of a function per message definition that reads a message of that
+    type from a CdrReader. Each function reads its fields in order with straight-line code, so
+    nothing about the definition is looked up while decoding.
+    """
 
-    if len(msgdef.fields) == 0:
-        # In case a message definition definition is empty, ROS 2 adds a
-        # `uint8 structure_needs_at_least_one_member` field when converting to IDL,
-        # to satisfy the requirement from IDL of not being empty.
-        # See also https://design.ros2.org/articles/legacy_interface_definition.html
-        reader.uint8()
+    def __init__(self, msgdefs: Dict[str, MessageSpecification]):
+        self._msgdefs = msgdefs
+        self._fn_names: Dict[Tuple[int, bool], str] = {}
+        self._msg_class_names: Dict[int, str] = {}
+        self._sources: List[str] = []
+        self._namespace: Dict[str, Any] = {}
+        self._unpack_names: Dict[str, str] = {}
+
+    def function_for(
+        self, msgdef: MessageSpecification, top_level: bool = False
+    ) -> str:
+        """Return the base name of the functions that read messages of type `msgdef`, generating
+        them and the functions for any nested types if needed. The function for little-endian
+        data is the base name followed by "_le", and for big-endian data by "_be".
+
+        Functions for `top_level` messages may only be called with the reader at the start of
+        the data, which lets them compute the offsets of leading fields ahead of time.
+        """
+        key = (id(msgdef), top_level)
+        fn_name = self._fn_names.get(key)
+        if fn_name is not None:
+            return fn_name
+        fn_name = f"_{'decode' if top_level else 'read'}_{len(self._fn_names)}"
+        # Registered before the fields are walked, so a nested field of the same type refers
+        # back to this function
+        self._fn_names[key] = fn_name
+
+        # Nested messages that aren't in arrays are read inline, so the whole message is read
+        # by one function, and runs of fixed-size fields continue across nested messages
+        leaves: List[Field] = []
+        msg_expression = self._flatten(msgdef, leaves, (id(msgdef),))
+        runs = _fixed_size_runs(leaves)
+
+        # The byte order is fixed for a message, so each function is generated once per byte
+        # order and the decoder picks one when it starts reading
+        for endian in ("le", "be"):
+            # The offset is kept in a local variable, and only stored to the reader around
+            # reads that go through it
+            lines = [f"def {fn_name}_{endian}(reader):", "    data = reader.data"]
+            if top_level:
+                position = _Position(4)
+            else:
+                position = _Position(None)
+                lines.append("    offset = reader.offset")
+            values: List[str] = []
+            for run in runs:
+                run_values = [f"f{len(values) + i}" for i in range(len(run))]
+                self._read_run(run, run_values, endian, position, lines)
+                values.extend(run_values)
+            lines.append(f"    reader.offset = {position.expression()}")
+            lines.append(f"    return {msg_expression}")
+            self._sources.append("\n".join(lines))
+        return fn_name
+
+    def _flatten(
+        self,
+        msgdef: MessageSpecification,
+        leaves: List[Field],
+        enclosing: Tuple[int, ...],
+    ) -> str:
+        """Append the fields to read for a message of type `msgdef` to `leaves`, in the order they
+        are read, and return the expression that builds the message from the values read for
+        them. Each leaf's value is named "f" followed by its index in `leaves`."""
+        if len(msgdef.fields) == 0:
+            # In case a message definition definition is empty, ROS 2 adds a
+            # `uint8 structure_needs_at_least_one_member` field when converting to IDL,
+            # to satisfy the requirement from IDL of not being empty.
+            # See also https://design.ros2.org/articles/legacy_interface_definition.html
+            leaves.append(EMPTY_MESSAGE_FIELD)
+
+        args: List[str] = []
+        for field in msgdef.fields:
+            ftype = field.type
+            nested_definition = (
+                self._msgdefs.get(f"{ftype.pkg_name}/{ftype.type}")
+                if not ftype.is_primitive_type() and not ftype.is_array
+                else None
+            )
+            if nested_definition is not None and id(nested_definition) not in enclosing:
+                args.append(
+                    self._flatten(
+                        nested_definition,
+                        leaves,
+                        enclosing + (id(nested_definition),),
+                    )
+                )
+            else:
+                args.append(f"f{len(leaves)}")
+                leaves.append(field)
+
+        msg_class = _msg_class_for(msgdef)
+        msg_class_name = self._msg_class_names.get(id(msg_class))
+        if msg_class_name is None:
+            msg_class_name = f"_Msg_{len(self._msg_class_names)}"
+            self._msg_class_names[id(msg_class)] = msg_class_name
+            self._namespace[msg_class_name] = msg_class
+        return f"{msg_class_name}({', '.join(args)})"
+
+    def compile(self, filename: str) -> Dict[str, Any]:
+        """Compile the generated functions, returning a namespace containing them by name."""
+        code = compile("\n\n".join(self._sources), filename, "exec")
+        exec(code, self._namespace)
+        return self._namespace
+
+    def _read_run(
+        self,
+        run: List[Field],
+        run_values: List[str],
+        endian: str,
+        position: "_Position",
+        lines: List[str],
+    ):
+        ftype = run[0].type
+        value = run_values[0]
+        if ftype.is_array:
+            self._read_array(run[0], value, endian, position, lines)
+        elif ftype.type in FIXED_SIZE_FORMATS and ftype.is_primitive_type():
+            # The run starts at its first field's alignment, which no later field exceeds, so
+            # the padding between its fields is the same for every message and one struct
+            # reads them all
+            fmt = ""
+            size = 0
+            for field in run:
+                code, field_size = FIXED_SIZE_FORMATS[field.type.type]
+                padding = -size % field_size
+                fmt += "x" * padding + code
+                size += padding + field_size
+            start = position.align(FIXED_SIZE_FORMATS[ftype.type][1], lines)
+            unpack = f"{self._bind_unpack(fmt, endian)}(data, {start})"
+            if len(run) == 1:
+                lines.append(f"    {value} = {unpack}[0]")
+            else:
+                lines.append(f"    {', '.join(run_values)} = {unpack}")
+            position.advance(size, lines)
+        elif ftype.type == "string":
+            start = position.align(4, lines)
+            lines += [
+                f"    length = {self._bind_unpack('I', endian)}(data, {start})[0]",
+                f"    offset = {_add(start, 4)} + length",
+                # CDR strings are null-terminated, but serializers differ on whether
+                # empty strings are length 0 or 1
+                f'    {value} = data[offset - length : offset - 1].decode("utf-8") '
+                'if length > 1 else ""',
+            ]
+            position.forget()
+        else:
+            self._read_with_reader(
+                value, self._read_expression(run[0], endian), position, lines
+            )
+
+    def _read_array(
+        self,
+        field: Field,
+        value: str,
+        endian: str,
+        position: "_Position",
+        lines: List[str],
+    ):
+        ftype = field.type
+        fixed_size = (
+            FIXED_SIZE_FORMATS.get(ftype.type) if ftype.is_primitive_type() else None
+        )
+        if ftype.is_fixed_size_array() and ftype.array_size is not None:
+            array_length = ftype.array_size
+            if ftype.type in BYTE_ARRAY_TYPES:
+                # Byte arrays are slices of the data
+                start = position.expression()
+                lines.append(
+                    f"    {value} = data[{start} : {_add(start, array_length)}]"
+                )
+                position.advance(array_length, lines)
+            elif fixed_size is not None:
+                # Arrays of a fixed number of fixed-size values are read like a run of fields
+                code, size = fixed_size
+                start = position.align(size, lines)
+                unpack = self._bind_unpack(f"{array_length}{code}", endian)
+                lines.append(f"    {value} = list({unpack}(data, {start}))")
+                position.advance(array_length * size, lines)
+            else:
+                self._read_with_reader(
+                    value,
+                    self._read_expression(field, endian, str(array_length)),
+                    position,
+                    lines,
+                )
+            return
+
+        # For dynamic length arrays we need to read a uint32 prefix
+        start = position.align(4, lines)
+        lines.append(f"    length = {self._bind_unpack('I', endian)}(data, {start})[0]")
+        position.advance(4, lines)
+        if ftype.type in BYTE_ARRAY_TYPES:
+            start = position.expression()
+            lines += [
+                f"    {value} = data[{start} : {start} + length]",
+                f"    offset = {start} + length",
+            ]
+            position.forget()
+        else:
+            self._read_with_reader(
+                value, self._read_expression(field, endian, "length"), position, lines
+            )
 
-    for field in msgdef.fields:
+    def _read_with_reader(
+        self, value: str, expression: str, position: "_Position", lines: List[str]
+    ):
+        lines += [
+            f"    reader.offset = {position.expression()}",
+            f"    {value} = {expression}",
+            "    offset = reader.offset",
+        ]
+        position.forget()
+
+    def _read_expression(
+        self, field: Field, endian: str, array_length: str = ""
+    ) -> str:
         ftype = field.type
         if not ftype.is_primitive_type():
             # Complex type
-            nested_definition = msgdefs.get(f"{ftype.pkg_name}/{ftype.type}")
+            nested_definition = self._msgdefs.get(f"{ftype.pkg_name}/{ftype.type}")
             if nested_definition is None:
-                raise ValueError(
-                    f'Message definition not found for field "{field.name}" with '
-                    'type "{ftype.type}"'
-                )
-
-            if ftype.is_array:
-                # For dynamic length arrays we need to read a uint32 prefix
-                array_length = (
-                    ftype.array_size
-                    if ftype.is_fixed_size_array() and ftype.array_size is not None
-                    else reader.uint32()
+                read_fn_name = self._bind(
+                    f"_missing_{field.name}_{ftype.type}",
+                    _make_missing_reader(field.name, ftype.type),
                 )
-                array = [
-                    _read_complex_type(
-                        nested_definition,
-                        msgdefs,
-                        reader,
-                    )
-                    for _ in range(array_length)
-                ]
-                setattr(msg, field.name, array)
             else:
-                value = _read_complex_type(
-                    nested_definition,
-                    msgdefs,
-                    reader,
-                )
-                setattr(msg, field.name, value)
-        else:
-            # Primitive type
+                read_fn_name = f"{self.function_for(nested_definition)}_{endian}"
             if ftype.is_array:
-                array_parser_fn = ARRAY_PARSERS.get(ftype.type)
-                if array_parser_fn is None:
-                    raise NotImplementedError(
-                        f"Parsing for type {ftype.type}[] is not implemented"
-                    )
-                # For dynamic length arrays we need to read a uint32 prefix
-                array_length = (
-                    ftype.array_size
-                    if ftype.is_fixed_size_array() and ftype.array_size is not None
-                    else reader.sequence_length()
+                return f"[{read_fn_name}(reader) for _ in range({array_length})]"
+            return f"{read_fn_name}(reader)"
+
+        # Primitive type
+        if ftype.is_array:
+            array_parser_fn = ARRAY_PARSERS.get(ftype.type)
+            if array_parser_fn is None:
+                raise NotImplementedError(
+                    f"Parsing for type {ftype.type}[] is not implemented"
                 )
-                value = array_parser_fn(reader, array_length)
-                setattr(msg, field.name, value)
-            else:
-                parser_fn = FIELD_PARSERS.get(ftype.type)
-                if parser_fn is None:
-                    raise NotImplementedError(
-                        f"Parsing for type {ftype.type} is not implemented"
-                    )
-                value = parser_fn(reader)
-                setattr(msg, field.name, value)
+            parser_name = self._bind(f"_parse_{ftype.type}_array", array_parser_fn)
+            return f"{parser_name}(reader, {array_length})"
+        parser_fn = FIELD_PARSERS.get(ftype.type)
+        if parser_fn is None:
+            raise NotImplementedError(
+                f"Parsing for type {ftype.type} is not implemented"
+            )
+        parser_name = self._bind(f"_parse_{ftype.type}", parser_fn)
+        return f"{parser_name}(reader)"
+
+    def _bind_unpack(self, fmt: str, endian: str) -> str:
+        unpack_name = self._unpack_names.get(fmt)
+        if unpack_name is None:
+            unpack_name = f"_unpack_{len(self._unpack_names)}"
+            self._unpack_names[fmt] = unpack_name
+            self._bind(f"{unpack_name}_le", struct.Struct("<" + fmt).unpack_from)
+            self._bind(f"{unpack_name}_be", struct.Struct(">" + fmt).unpack_from)
+        return f"{unpack_name}_{endian}"
+
+    def _bind(self, name: str, value: Any) -> str:
+        self._namespace.setdefault(name, value)
+        return name
+
+
+class _Position:
+    """What is known about the read offset at a point in a generated read function. Either the
+    offset itself is known, or the offset is in the local variable `offset` and only its
+    remainder modulo `alignment`, relative to the 4-byte CDR header, is known."""
+
+    def __init__(self, offset: Optional[int]):
+        self.offset = offset
+        self.alignment = 1
+        self.remainder = 0
+
+    def expression(self) -> str:
+        """Return an expression for the current offset."""
+        return "offset" if self.offset is None else str(self.offset)
+
+    def align(self, size: int, lines: List[str]) -> str:
+        """Align the offset to `size`, appending any lines that needs, and return an expression
+        for the aligned offset."""
+        if self.offset is not None:
+            self.offset += -(self.offset - 4) % size
+            return str(self.offset)
+        if self.alignment >= size:
+            # The padding is the same for every message
+            self.advance(-self.remainder % size, lines)
+        else:
+            lines.append(f"    offset = {ALIGNED_OFFSETS[size]}")
+            self.alignment = size
+            self.remainder = 0
+        return "offset"
+
+    def advance(self, size: int, lines: List[str]):
+        """Move the offset forward by `size` bytes, appending any lines that needs."""
+        if self.offset is not None:
+            self.offset += size
+        elif size != 0:
+            lines.append(f"    offset += {size}")
+            self.remainder = (self.remainder + size) % self.alignment
+
+    def forget(self):
+        """Record that the offset has been stored to `offset` after a read of unknown size."""
+        self.offset = None
+        self.alignment = 1
+        self.remainder = 0
+
+
+def _add(expression: str, value: int) -> str:
+    # Folds constant offsets, so generated code indexes the data with literals where it can
+    return (
+        str(int(expression) + value)
+        if expression.isdigit()
+        else f"{expression} + {value}"
+    )
+
+
+def _fixed_size_runs(fields: List[Field]) -> List[List[Field]]:
+    """Split fields into runs of fixed-size primitive fields that can be read with one struct.
+    Each other field is a run on its own."""
+    runs: List[List[Field]] = []
+    run_alignment = 0
+    for field in fields:
+        ftype = field.type
+        fixed_size = (
+            FIXED_SIZE_FORMATS.get(ftype.type)
+            if ftype.is_primitive_type() and not ftype.is_array
+            else None
+        )
+        if fixed_size is not None and runs and run_alignment >= fixed_size[1]:
+            runs[-1].append(field)
+        else:
+            runs.append([field])
+            run_alignment = fixed_size[1] if fixed_size is not None else 0
+    return runs
+
+
+def _make_missing_reader(
+    field_name: str, type_name: str
+) -> Callable[[CdrReader], DecodedMessage]:
+    # A missing nested definition only fails decoding if a message with that field is read
+    def read_missing(reader: CdrReader) -> DecodedMessage:
+        raise ValueError(
+            f'Message definition not found for field "{field_name}" with '
+            f'type "{type_name}"'
+        )
+
+    return read_missing
+
+
+def _msg_class_for(msgdef: MessageSpecification) -> type:
+    """Return the class of decoded messages of type `msgdef`, creating it on first use. The class
+    is kept on the message definition, so each definition only creates one."""
+    msg_class = getattr(msgdef, "_msg_class", None)
+    if msg_class is None:
+        field_names = [field.name for field in msgdef.fields]
+        msg_class = type(
+            msgdef.msg_name,
+            (),
+            {
+                "__name__": msgdef.msg_name,
+                "__slots__": tuple(field_names),
+                **_make_msg_methods(msgdef.msg_name, field_names),
+                "_type": str(msgdef.base_type),
+                "_full_text": _FullText(msgdef),
+            },
+        )
+        msgdef._msg_class = msg_class  # type: ignore
+    return msg_class
+
+
+def _make_msg_methods(msg_name: str, field_names: List[str]) -> Dict[str, Any]:
+    # Generated with the fields written out, so that constructing, comparing and printing
+    # messages doesn't loop over the field names
+    params = [f"{name}_" if keyword.iskeyword(name) else name for name in field_names]
+    args = "".join(f", {param}=None" for param in params)
+    # Field names start with a lowercase letter, so the receiver and setattr are given names
+    # that can't clash with a parameter such as "self"
+    lines = [f"def __init__(__mcap_self{args}):"]
+    for name, param in zip(field_names, params):
+        if name != param:
+            lines.append(f"    __mcap_setattr(__mcap_self, {name!r}, {param})")
+        else:
+            lines.append(f"    __mcap_self.{name} = {param}")
+    if not field_names:
+        lines.append("    pass")
+
+    comparisons = "".join(
+        f" and {_attribute('self', name)} == {_attribute('other', name)}"
+        for name in field_names
+    )
+    lines.append("def __eq__(self, other):")
+    lines.append(f"    return isinstance(other, type(self)){comparisons}")
+    lines.append("def __ne__(self, other):")
+    lines.append("    return not self.__eq__(other)")
+
+    fields = ", ".join(f"{name}={{{_attribute('self', name)}}}" for name in field_names)
+    lines.append("def __repr__(self):")
+    lines.append(f'    return f"{msg_name}({fields})"')
+
+    namespace: Dict[str, Any] = {"__mcap_setattr": setattr}
+    exec(compile("\n".join(lines), f"<mcap_ros2:{msg_name}>", "exec"), namespace)
+    return {
+        "__init__": namespace["__init__"],
+        "__eq__": namespace["__eq__"],
+        "__ne__": namespace["__ne__"],
+        "__repr__": namespace["__repr__"],
+        "__str__": namespace["__repr__"],
+    }
+
 
-    return msg
+def _attribute(obj: str, name: str) -> str:
+    # Fields named after Python keywords can't be accessed with attribute syntax
+    return f"getattr({obj}, {name!r})" if keyword.iskeyword(name) else f"{obj}.{name}"
+
+
+class _FullText:
+    """The `_full_text` attribute of a decoded message class. The definition is only converted to
+    text if it is accessed."""
+
+    __slots__ = ("_msgdef", "_text")
+
+    def __init__(self, msgdef: MessageSpecification):
+        self._msgdef = msgdef
+        self._text: Optional[str] = None
+
+    def __get__(self, obj: Any, objtype: Any = None) -> str:
+        if self._text is None:
+            self._text = str(self._msgdef)
+        return self._text
+
+
+def _resolve_nested_definitions(msgdefs: Dict[str, MessageSpecification]) -> None:
+    """Store the definition of each complex field's type on the field, so that encoding a
+    message doesn't look it up in `msgdefs` for every nested value."""
+    for msgdef in msgdefs.values():
+        for field in msgdef.fields:
+            ftype = field.type
+            if not ftype.is_primitive_type():
+                field._nested_definition = msgdefs.get(  # type: ignore
+                    f"{ftype.pkg_name}/{ftype.type}"
+                )
 
 
 def _write_complex_type(
@@ -349,11 +826,20 @@ def _write_complex_type(
         # See also https://design.ros2.org/articles/legacy_interface_definition.html
         writer.write_uint8(0x00)
 
+    # Messages are usually dicts, which don't need the attribute lookup first
+    get_property: Callable[[str], Any] = (
+        ros2_msg.get if isinstance(ros2_msg, dict) else partial(_get_property, ros2_msg)
+    )
+
     for field in fields:
         ftype = field.type
         if not ftype.is_primitive_type():
             # Complex type
-            nested_definition = msgdefs.get(f"{ftype.pkg_name}/{ftype.type}")
+            try:
+                nested_definition = field._nested_definition  # type: ignore
+            except AttributeError:
+                # Not resolved by serialize_dynamic
+                nested_definition = msgdefs.get(f"{ftype.pkg_name}/{ftype.type}")
             if nested_definition is None:
                 raise ValueError(
                     f'Message definition not found for field "{field.name}" with '
@@ -361,9 +847,7 @@ def _write_complex_type(
                 )
 
             if ftype.is_array:
-                array: Union[List[Any], Tuple[Any], Any] = _get_property(
-                    ros2_msg, field.name
-                )
+                array: Union[List[Any], Tuple[Any], Any] = get_property(field.name)
                 if array is None:
                     array = []
                 if not isinstance(array, list):
@@ -374,8 +858,8 @@ def _write_complex_type(
 
                 if ftype.is_fixed_size_array() and ftype.array_size is not None:
                     # Fixed length array, ensure the input array is the correct length
-                    while len(array) < ftype.array_size:
-                        array.append({})
+                    if len(array) < ftype.array_size:
+                        array = array + [{}] * (ftype.array_size - len(array))
                     if len(array) > ftype.array_size:
                         array = array[: ftype.array_size]
 
@@ -412,21 +896,20 @@ def _write_complex_type(
                     nested_definition.msg_name,
                     nested_definition.fields,
                     msgdefs,
-                    _get_property(ros2_msg, field.name) or {},
+                    get_property(field.name) or {},
                     writer,
                 )
         else:
             # Primitive type
             if ftype.is_array:
-                array: Union[List[Any], Tuple[Any], Any] = _get_property(
-                    ros2_msg, field.name
-                )
+                array: Union[List[Any], Tuple[Any], Any] = get_property(field.name)
                 if array is None:
                     array = []
                 if (
                     not isinstance(array, list)
                     and not isinstance(array, tuple)
                     and not isinstance(array, bytes)
+                    and not isinstance(array, py_array.array)
                 ):
                     raise ValueError(
                         f'Field "{field.name}" is not an array ({type(array)}) but has array type '
@@ -443,12 +926,8 @@ def _write_complex_type(
 
                     if ftype.is_fixed_size_array() and ftype.array_size is not None:
                         # Fixed length byte array, ensure the input array is the correct length
-                        while len(byte_array) < ftype.array_size:
-                            byte_array += b"\0"
-                        if len(byte_array) > ftype.array_size:
-                            byte_array = byte_array[: ftype.array_size]
-
-                        writer.write_bytes(byte_array)
+                        writer.write_bytes(byte_array[: ftype.array_size])
+                        writer.write_zeros(ftype.array_size - len(byte_array))
                     else:
                         # Limit the byte array to the upper bound length, if present
                         if (
@@ -470,12 +949,14 @@ def _write_complex_type(
                         )
 
                     if ftype.is_fixed_size_array() and ftype.array_size is not None:
-                        # Convert tuples to lists
-                        list_array = list(array) if isinstance(array, tuple) else array
+                        # Convert tuples and array.arrays to lists
+                        list_array = list(array) if not isinstance(array, list) else array
 
                         # Fixed length array, ensure the input array is the correct length
-                        while len(list_array) < ftype.array_size:
-                            list_array.append(None)
+                        if len(list_array) < ftype.array_size:
+                            list_array = list_array + [None] * (
+                                ftype.array_size - len(list_array)
+                            )
                         if len(list_array) > ftype.array_size:
                             list_array = list_array[: ftype.array_size]
 
@@ -505,7 +986,7 @@ def _write_complex_type(
                         f"Writing for type {ftype.type} is not implemented"
                     )
 
-                value = _get_property(ros2_msg, field.name)
+                value = get_property(field.name)
                 value: Any = _coerce_value(value, ftype.type, field.default_value)
                 writer_fn(writer, value)
 
@@ -517,22 +998,21 @@ def _for_each_msgdef(
 ) -> None:
     cur_schema_name = schema_name
 
-    # Remove empty lines
-    schema_text = "\n".join([s for s in schema_text.splitlines() if s.strip()])
+    # Remove empty lines. They can't be left to the parser, which ends file-level comments at
+    # the first empty line
+    schema_text = "\n".join(filter(str.strip, schema_text.splitlines()))
 
     # Split schema_text by separator lines containing at least 3 = characters
     # (e.g. "===") using a regular expression
-    for cur_schema_text in re.split(r"^={3,}$", schema_text, flags=re.MULTILINE):
+    for cur_schema_text in SEPARATOR_PATTERN.split(schema_text):
         cur_schema_text = cur_schema_text.strip()
 
         # Check for a "MSG: pkg_name/msg_name" line
-        match = re.match(r"^MSG:\s+(\S+)$", cur_schema_text, flags=re.MULTILINE)
+        match = MSG_NAME_PATTERN.match(cur_schema_text)
         if match:
             cur_schema_name = match.group(1)
             # Remove this line from the message definition
-            cur_schema_text = re.sub(
-                r"^MSG:\s+(\S+)$", "", cur_schema_text, flags=re.MULTILINE
-            )
+            cur_schema_text = MSG_NAME_PATTERN.sub("", cur_schema_text)
 
         # Parse the package and message names from the schema name
         # (e.g. "std_msgs/msg/String" -> "std_msgs")
@@ -544,9 +1024,13 @@ def _for_each_msgdef(
         fn(cur_schema_name, short_name, msgdef)
 
 
+_MISSING = object()
+
+
 def _get_property(obj: Any, name: str) -> Any:
-    if hasattr(obj, name):
-        return getattr(obj, name)
+    value = getattr(obj, name, _MISSING)
+    if value is not _MISSING:
+        return value
     try:
         return obj[name]
     except (KeyError, TypeError):
@@ -559,72 +1043,24 @@ def _coerce_value(
     if isinstance(default_value, list):
         raise ValueError("Default value for primitive types cannot be an array")
 
-    if type_name in STRING_TYPES:
-        return (
-            str(value)
-            if value is not None
-            else default_value
-            if default_value is not None
-            else ""
-        )
-    elif type_name in FLOAT_TYPES:
-        return (
-            float(value)
-            if value is not None
-            else default_value
-            if default_value is not None
-            else 0.0
-        )
-    elif type_name in INT_TYPES:
-        return (
-            int(value)
-            if value is not None
-            else default_value
-            if default_value is not None
-            else 0
-        )
-    elif type_name == "bool":
-        return (
-            bool(value)
-            if value is not None
-            else default_value
-            if default_value is not None
-            else False
-        )
-    else:
+    cast = PRIMITIVE_CASTS.get(type_name)
+    if cast is None:
         raise NotImplementedError(f'coercion for type "{type_name}" is not implemented')
+    if value is not None:
+        return cast(value)
+    if default_value is not None:
+        return default_value
+    return cast()
 
 
 def _coerce_values(
-    values: Union[List[Any], Tuple[Any]],
+    values: Sequence[Any],
     type_name: str,
     default_value: Optional[DefaultValue],
 ) -> List[PrimitiveValue]:
+    cast = PRIMITIVE_CASTS.get(type_name)
+    if cast is not None and not isinstance(default_value, list) and None not in values:
+        # No value needs the default, so every value is converted by map without a Python
+        # call per value
+        return list(map(cast, values))
     return [_coerce_value(value, type_name, default_value) for value in values]
-
-
-def __repr__(self: Any) -> str:
-    fields = ", ".join(f"{field}={getattr(self, field)}" for field in self.__slots__)
-    return f"{self.__name__}({fields})"
-
-
-def __eq__(self: Any, other: Any) -> bool:
-    if not isinstance(other, type(self)):
-        return False
-
-    if (
-        not hasattr(self, "__slots__")
-        or not hasattr(other, "__slots__")
-        or len(self.__slots__) != len(other.__slots__)
-    ):
-        return False
-
-    for attr in self.__slots__:
-        if getattr(self, attr) != getattr(other, attr):
-            return False
-
-    return True
-
-
-def __ne__(self: Any, other: Any) -> bool:
-    return not __eq__(self, other)
@@ -64,8 +64,12 @@ For similar functionality, instantiate the `mcap.reader.McapReader` with a
             DeprecationWarning,
         )
         self._decoder_factory = DecoderFactory()
+        self._decoders: Dict[int, Callable[[bytes], DecodedMessage]] = {}
 
     def decode(self, schema: Schema, message: Message) -> Any:
-        decoder = self._decoder_factory.decoder_for(MessageEncoding.CDR, schema)
-        assert decoder is not None
+        decoder = self._decoders.get(schema.id)
+        if decoder is None:
+            decoder = self._decoder_factory.decoder_for(MessageEncoding.CDR, schema)
+            assert decoder is not None
+            self._decoders[schema.id] = decoder
         return decoder(message.data)
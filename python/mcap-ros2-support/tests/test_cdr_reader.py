@@ -1,6 +1,8 @@
+import struct
 from io import BytesIO
 from math import inf
 
+import pytest
 from mcap_ros2._cdr import CdrReader, CdrWriter, EncapsulationKind
 
 tf2_msg__TFMessage = (
@@ -97,6 +99,34 @@ def test_read_big_endian():
     assert reader.uint64BE() == 0xDEF0000000000000
 
 
+def test_alignment():
+    for padding in range(9):
+        buffer = BytesIO()
+        writer = CdrWriter(buffer)
+        for _ in range(padding):
+            writer.write_uint8(0xFF)
+        writer.write_int16(-2)
+        writer.write_uint8(0xFF)
+        writer.write_uint32(4)
+        writer.write_uint8(0xFF)
+        writer.write_float64(8.5)
+        writer.write_uint8(0xFF)
+        writer.write_int64(-8)
+
+        data = buffer.getvalue()
+        reader = CdrReader(data)
+        for _ in range(padding):
+            assert reader.uint8() == 0xFF
+        assert reader.int16() == -2
+        assert reader.uint8() == 0xFF
+        assert reader.uint32() == 4
+        assert reader.uint8() == 0xFF
+        assert reader.float64() == 8.5
+        assert reader.uint8() == 0xFF
+        assert reader.int64() == -8
+        assert reader.decoded_bytes() == len(data)
+
+
 def test_seeking():
     data = bytes.fromhex(tf2_msg__TFMessage)
     reader = CdrReader(data)
@@ -148,14 +178,33 @@ def test_arrays():
         assert isinstance(read_fn, str)
         assert isinstance(array, list)
 
-        buffer = BytesIO()
-        writer = CdrWriter(buffer)
-        writer.write_uint32(len(array))
-        getattr(writer, write_fn)(array)
-
-        data = buffer.getvalue()
-        reader = CdrReader(data)
-        output = output or array
-        assert reader.sequence_length() == len(array)
-        assert getattr(reader, read_fn)(len(array)) == output
-        assert reader.decoded_bytes() == len(data)
+        for kind in (EncapsulationKind.CDR_LE, EncapsulationKind.CDR_BE):
+            buffer = BytesIO()
+            writer = CdrWriter(buffer, kind)
+            # Misalign the array so that its first element needs padding
+            writer.write_uint8(1)
+            writer.write_uint32(len(array))
+            writer.write_uint8(1)
+            getattr(writer, write_fn)(array)
+
+            data = buffer.getvalue()
+            reader = CdrReader(data)
+            assert reader.uint8() == 1
+            assert reader.sequence_length() == len(array)
+            assert reader.uint8() == 1
+            assert getattr(reader, read_fn)(len(array)) == (output or array)
+            assert reader.decoded_bytes() == len(data)
+
+
+def test_truncated_arrays():
+    buffer = BytesIO()
+    writer = CdrWriter(buffer)
+    writer.write_boolean_array([True, True, True])
+    writer.write_int32_array([1, 2])
+    data = buffer.getvalue()
+    with pytest.raises(struct.error):
+        CdrReader(data[:6]).boolean_array(3)
+    reader = CdrReader(data[:-1])
+    assert reader.boolean_array(3) == [True, True, True]
+    with pytest.raises(struct.error):
+        reader.int32_array(2)
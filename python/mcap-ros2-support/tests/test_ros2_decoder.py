@@ -1,3 +1,13 @@
+from io import BytesIO
+
+from mcap_ros2._cdr import CdrWriter, EncapsulationKind
+from mcap_ros2._dynamic import (
+    _read_message_decoder,
+    generate_dynamic,
+    read_message,
+    serialize_dynamic,
+)
+from mcap_ros2._vendor.rosidl_adapter.parser import parse_message_string
 from mcap_ros2.decoder import DecoderFactory
 
 from mcap.reader import make_reader
@@ -15,6 +25,8 @@ def test_ros2_decoder():
             assert ros_msg.data == f"string message {index}"
             assert ros_msg._type == "std_msgs/String"
             assert ros_msg._full_text == "# std_msgs/String\nstring data"
+            # Fields are stored in slots only
+            assert not hasattr(ros_msg, "__dict__")
             count += 1
         assert count == 10
 
@@ -37,3 +49,131 @@ def test_ros2_decoder_msg_eq():
         assert msg1.data == "string message 1"
         assert msg0 == msg0 and msg1 == msg1
         assert msg0 != msg1 and msg1 != msg0
+        assert repr(msg0) == "String(data=string message 0)"
+        # The message class is created once per schema, not per message
+        assert type(msg0) is type(msg1)
+
+
+def test_decode_fixed_size_fields():
+    schema = "uint8 a\nfloat64 b\nint16 c\nbool d\nuint32 e\nstring f\nint8 g\nint64 h"
+    decoder = generate_dynamic("test_msgs/Fixed", schema)["test_msgs/Fixed"]
+    for kind in (EncapsulationKind.CDR_LE, EncapsulationKind.CDR_BE):
+        output = BytesIO()
+        writer = CdrWriter(output, kind)
+        writer.write_uint8(200)
+        writer.write_float64(1.25)
+        writer.write_int16(-3)
+        writer.write_boolean(True)
+        writer.write_uint32(70000)
+        writer.write_string("abc")
+        writer.write_int8(-4)
+        writer.write_int64(-(2**40))
+        msg = decoder(output.getvalue())
+        assert (msg.a, msg.b, msg.c, msg.d, msg.e) == (200, 1.25, -3, True, 70000)
+        assert (msg.f, msg.g, msg.h) == ("abc", -4, -(2**40))
+
+
+def test_decode_strings_and_arrays():
+    schema = (
+        "string a\nuint8[] b\nstring c\nint32[] d\nbyte[2] e\nPoint[] f\nfloat64 g\n"
+        "================================================================================\n"
+        "MSG: test_msgs/Point\n"
+        "int16 x\n"
+    )
+    decoder = generate_dynamic("test_msgs/Arrays", schema)["test_msgs/Arrays"]
+    for kind in (EncapsulationKind.CDR_LE, EncapsulationKind.CDR_BE):
+        output = BytesIO()
+        writer = CdrWriter(output, kind)
+        writer.write_string("")
+        writer.write_uint32(3)
+        writer.write_uint8_array(b"xyz")
+        writer.write_string("abc")
+        writer.write_uint32(2)
+        writer.write_int32_array([-1, 70000])
+        writer.write_uint8_array(b"pq")
+        writer.write_uint32(2)
+        writer.write_int16(5)
+        writer.write_int16(-6)
+        writer.write_float64(0.5)
+        msg = decoder(output.getvalue())
+        assert (msg.a, msg.b, msg.c, msg.d, msg.e) == (
+            "",
+            b"xyz",
+            "abc",
+            [-1, 70000],
+            b"pq",
+        )
+        assert [point.x for point in msg.f] == [5, -6]
+        assert msg.g == 0.5
+
+
+def test_decode_fixed_length_arrays():
+    schema = "uint8 a\nfloat32[2] b\nbool[2] c\nbyte[3] d\nfloat64 e\nint16[2] f"
+    decoder = generate_dynamic("test_msgs/Fixed", schema)["test_msgs/Fixed"]
+    for kind in (EncapsulationKind.CDR_LE, EncapsulationKind.CDR_BE):
+        output = BytesIO()
+        writer = CdrWriter(output, kind)
+        writer.write_uint8(1)
+        writer.write_float32_array([0.5, -2.0])
+        writer.write_boolean_array([False, True])
+        writer.write_uint8_array(b"xyz")
+        writer.write_float64(1.25)
+        writer.write_int16_array([-3, 4])
+        msg = decoder(output.getvalue())
+        assert (msg.a, msg.b, msg.c, msg.d) == (1, [0.5, -2.0], [False, True], b"xyz")
+        assert (msg.e, msg.f) == (1.25, [-3, 4])
+
+
+def test_read_message():
+    msgdefs = {
+        "test_msgs/Pair": parse_message_string("test_msgs", "Pair", "int16 a\nstring b")
+    }
+    misses = _read_message_decoder.cache_info().misses
+    for kind in (EncapsulationKind.CDR_LE, EncapsulationKind.CDR_BE):
+        output = BytesIO()
+        writer = CdrWriter(output, kind)
+        writer.write_int16(-3)
+        writer.write_string("abc")
+        msg = read_message("test_msgs/Pair", msgdefs, output.getvalue())
+        assert (msg.a, msg.b) == (-3, "abc")
+    # The decoder is generated once for the definitions
+    assert _read_message_decoder.cache_info().misses == misses + 1
+
+
+def test_decode_fields_named_after_generated_names():
+    schema = "int16 self\nint16 other\nint16 setattr\nint16 class"
+    decoder = generate_dynamic("test_msgs/Names", schema)["test_msgs/Names"]
+    output = BytesIO()
+    writer = CdrWriter(output)
+    for value in (1, 2, 3, 4):
+        writer.write_int16(value)
+    msg = decoder(output.getvalue())
+    assert (msg.self, msg.other, msg.setattr, getattr(msg, "class")) == (1, 2, 3, 4)
+    assert msg == decoder(output.getvalue())
+    assert repr(msg) == "Names(self=1, other=2, setattr=3, class=4)"
+
+
+def test_decoders_shared_between_factories():
+    with generate_sample_data() as m:
+        reader = make_reader(m)
+        schema = next(s for s in reader.get_summary().schemas.values())
+        decoder1 = DecoderFactory().decoder_for("cdr", schema)
+        decoder2 = DecoderFactory().decoder_for("cdr", schema)
+        assert decoder1 is not None and decoder1 is decoder2
+
+
+def test_decode_inlined_nested_messages():
+    schema = (
+        "Inner a\nuint8 b\nInner c\n"
+        "================================================================================\n"
+        "MSG: test_msgs/Inner\nfloat64 x\nEmpty e\nint16 y\n"
+        "================================================================================\n"
+        "MSG: test_msgs/Empty\n"
+    )
+    encoder = serialize_dynamic("test_msgs/Outer", schema)["test_msgs/Outer"]
+    decoder = generate_dynamic("test_msgs/Outer", schema)["test_msgs/Outer"]
+    msg = decoder(
+        encoder({"a": {"x": 1.5, "y": -1}, "b": 7, "c": {"x": -2.5, "y": 300}})
+    )
+    assert (msg.a.x, msg.a.y, msg.b, msg.c.x, msg.c.y) == (1.5, -1, 7, -2.5, 300)
+    assert msg.a.e._type == "test_msgs/Empty"
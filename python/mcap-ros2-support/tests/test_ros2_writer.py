@@ -1,3 +1,4 @@
+from array import array
 from io import BytesIO
 
 from mcap_ros2.decoder import DecoderFactory
@@ -59,3 +60,118 @@ def test_write_std_msgs_empty_messages():
         assert msg.message.log_time == index
         assert msg.message.publish_time == index
         assert msg.message.sequence == index
+
+
+def test_write_nested_messages():
+    output = BytesIO()
+    ros_writer = Ros2Writer(output=output)
+    schema = ros_writer.register_msgdef(
+        "test_msgs/Path",
+        "Point[] points\nPoint origin\nfloat64[3] scale\nuint8[] data\nstring name\n"
+        "================================================================================\n"
+        "MSG: test_msgs/Point\n"
+        "float64 x\nfloat64 y\n",
+    )
+    for i in range(0, 10):
+        ros_writer.write_message(
+            topic="/path",
+            schema=schema,
+            message={
+                "points": [{"x": float(j), "y": float(-j)} for j in range(i)],
+                "origin": {"x": 1.5, "y": 2.5},
+                "scale": [1.0, 2.0, float(i)],
+                "data": bytes(range(i)),
+                "name": f"path {i}",
+            },
+            log_time=i,
+            publish_time=i,
+            sequence=i,
+        )
+    ros_writer.finish()
+
+    output.seek(0)
+    for index, msg in enumerate(read_ros2_messages(output)):
+        decoded = msg.decoded_message
+        assert [(p.x, p.y) for p in decoded.points] == [
+            (float(j), float(-j)) for j in range(index)
+        ]
+        assert (decoded.origin.x, decoded.origin.y) == (1.5, 2.5)
+        assert decoded.scale == [1.0, 2.0, float(index)]
+        assert decoded.data == bytes(range(index))
+        assert decoded.name == f"path {index}"
+
+
+def test_write_dict_fields_named_like_dict_methods():
+    output = BytesIO()
+    ros_writer = Ros2Writer(output=output)
+    schema = ros_writer.register_msgdef(
+        "test_msgs/Table", "string keys\nint32[] values"
+    )
+    ros_writer.write_message(
+        topic="/table",
+        schema=schema,
+        message={"keys": "a,b", "values": [1, 2]},
+        log_time=0,
+        publish_time=0,
+        sequence=0,
+    )
+    ros_writer.finish()
+
+    output.seek(0)
+    (msg,) = read_ros2_messages(output)
+    assert msg.decoded_message.keys == "a,b"
+    assert msg.decoded_message.values == [1, 2]
+
+
+def test_write_fixed_length_arrays():
+    output = BytesIO()
+    ros_writer = Ros2Writer(output=output)
+    schema = ros_writer.register_msgdef(
+        "test_msgs/Fixed", "uint8[4] data\nfloat64[3] values"
+    )
+    values = [1.0]
+    for data in (b"ab", b"abcdefg"):
+        ros_writer.write_message(
+            topic="/fixed",
+            schema=schema,
+            message={"data": data, "values": values},
+            log_time=0,
+            publish_time=0,
+            sequence=0,
+        )
+    ros_writer.finish()
+    # Short arrays are padded without modifying the message
+    assert values == [1.0]
+
+    output.seek(0)
+    padded, truncated = read_ros2_messages(output)
+    assert padded.decoded_message.data == b"ab\0\0"
+    assert truncated.decoded_message.data == b"abcd"
+    assert padded.decoded_message.values == [1.0, 0.0, 0.0]
+
+
+def test_write_array_module_arrays():
+    output = BytesIO()
+    ros_writer = Ros2Writer(output=output)
+    schema = ros_writer.register_msgdef(
+        "test_msgs/Arrays", "float32[] a\nint16[3] b\nuint8[] c"
+    )
+    ros_writer.write_message(
+        topic="/arrays",
+        schema=schema,
+        message={
+            "a": array("f", [1.0, 2.5]),
+            "b": array("h", [-1, 2]),
+            "c": array("B", [3, 4]),
+        },
+        log_time=0,
+        publish_time=0,
+        sequence=0,
+    )
+    ros_writer.finish()
+
+    output.seek(0)
+    (msg,) = read_ros2_messages(output)
+    assert msg.decoded_message.a == [1.0, 2.5]
+    assert msg.decoded_message.b == [-1, 2, 0]
+    assert msg.decoded_message.c == b"\x03\x04"
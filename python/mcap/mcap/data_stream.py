@@ -1,11 +1,14 @@
 import struct
 import zlib
 from io import BytesIO
-from typing import IO, Optional
+from typing import IO, Optional, Tuple
 
 from .exceptions import EndOfFile
 from .opcode import Opcode
 
+# opcode and length prefix of every record.
+RECORD_HEADER = struct.Struct("<BQ")
+
 
 class ReadDataStream:
     def __init__(self, stream: IO[bytes], calculate_crc: bool = False):
@@ -53,6 +56,14 @@ class ReadDataStream:
         [value] = struct.unpack("<Q", self.read(8))
         return value
 
+    def read_record_header(self) -> Tuple[int, int]:
+        """reads the opcode and length that precede every record, with one read and one unpack
+        rather than one of each per field."""
+        data = self.read(RECORD_HEADER.size)
+        if len(data) < RECORD_HEADER.size:
+            raise EndOfFile()
+        return RECORD_HEADER.unpack(data)
+
     def read_prefixed_string(self) -> str:
         length = self.read4()
         return str(self.read(length), "utf-8")
@@ -171,27 +171,28 @@ class McapReader(ABC):
             topics, start_time, end_time, log_time_order, reverse
         )
 
-        def decoded_message(
-            schema: Optional[Schema], channel: Channel, message: Message
-        ) -> Any:
-            decoder = self._decoders.get(message.channel_id)
-            if decoder is not None:
-                return decoder(message.data)
+        def decoder_for(
+            schema: Optional[Schema], channel: Channel
+        ) -> Callable[[bytes], Any]:
             for factory in self._decoder_factories:
                 decoder = factory.decoder_for(channel.message_encoding, schema)
                 if decoder is not None:
-                    self._decoders[message.channel_id] = decoder
-                    return decoder(message.data)
+                    self._decoders[channel.id] = decoder
+                    return decoder
 
             raise DecoderNotFoundError(
                 f"no decoder factory supplied for message encoding {channel.message_encoding}, "
                 f"schema {schema}"
             )
 
+        # The factories are only consulted the first time a channel is seen, so the loop
+        # itself only looks up the decoder for each message's channel.
+        get_decoder = self._decoders.get
         for schema, channel, message in message_iterator:
-            yield DecodedMessageTuple(
-                schema, channel, message, decoded_message(schema, channel, message)
-            )
+            decoder = get_decoder(message.channel_id)
+            if decoder is None:
+                decoder = decoder_for(schema, channel)
+            yield DecodedMessageTuple(schema, channel, message, decoder(message.data))
 
     @abstractmethod
     def get_header(self) -> Header:
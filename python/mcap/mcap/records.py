@@ -1,10 +1,17 @@
+import struct
+import sys
 import zlib
 from dataclasses import dataclass, field
 from typing import Dict, List, Tuple
 
-from .data_stream import ReadDataStream, RecordBuilder
+from .data_stream import RECORD_HEADER, ReadDataStream, RecordBuilder
 from .opcode import Opcode
 
+# fixed-size fields of a Message record, which precede its data.
+MESSAGE_FIELDS = struct.Struct("<HIQQ")
+# record header and fixed-size fields of a Message record, packed together when writing.
+_MESSAGE_HEADER = struct.Struct(RECORD_HEADER.format + MESSAGE_FIELDS.format[1:])
+
 
 @dataclass
 class McapRecord:
@@ -123,8 +130,10 @@ class Channel(McapRecord):
     def read(stream: ReadDataStream):
         id = stream.read2()
         schema_id = stream.read2()
-        topic = stream.read_prefixed_string()
-        message_encoding = stream.read_prefixed_string()
+        # Channel records are repeated in every chunk that uses them, so their strings are
+        # interned to share one copy, which also makes comparing them an identity check.
+        topic = sys.intern(stream.read_prefixed_string())
+        message_encoding = sys.intern(stream.read_prefixed_string())
         metadata_length = stream.read4()
         metadata_end = stream.count + metadata_length
         metadata: Dict[str, str] = {}
@@ -306,13 +315,19 @@ class Message(McapRecord):
     sequence: int
 
     def write(self, stream: RecordBuilder):
-        stream.start_record(Opcode.MESSAGE)
-        stream.write2(self.channel_id)
-        stream.write4(self.sequence)
-        stream.write8(self.log_time)
-        stream.write8(self.publish_time)
+        # The record length is known up front, so the header and fields are packed in one call
+        # rather than patching the length in afterwards.
+        stream.write(
+            _MESSAGE_HEADER.pack(
+                Opcode.MESSAGE,
+                MESSAGE_FIELDS.size + len(self.data),
+                self.channel_id,
+                self.sequence,
+                self.log_time,
+                self.publish_time,
+            )
+        )
         stream.write(self.data)
-        stream.finish_record()
 
     @staticmethod
     def read(stream: ReadDataStream, length: int):
@@ -320,7 +335,7 @@ class Message(McapRecord):
         sequence = stream.read4()
         log_time = stream.read8()
         publish_time = stream.read8()
-        data = stream.read(length - 22)
+        data = stream.read(length - MESSAGE_FIELDS.size)
         return Message(
             channel_id=channel_id,
             log_time=log_time,
@@ -429,8 +444,9 @@ class Schema(McapRecord):
     @staticmethod
     def read(stream: ReadDataStream):
         id = stream.read2()
-        name = stream.read_prefixed_string()
-        encoding = stream.read_prefixed_string()
+        # interned for the same reason as Channel strings.
+        name = sys.intern(stream.read_prefixed_string())
+        encoding = sys.intern(stream.read_prefixed_string())
         data_length = stream.read4()
         data = stream.read(data_length)
         return Schema(id=id, name=name, encoding=encoding, data=data)
@@ -6,10 +6,11 @@ from typing import IO, Iterator, List, Optional, Tuple, Union
 import lz4.frame  # type: ignore
 import zstandard
 
-from .data_stream import ReadDataStream
-from .exceptions import InvalidMagic, RecordLengthLimitExceeded
+from .data_stream import RECORD_HEADER, ReadDataStream
+from .exceptions import EndOfFile, InvalidMagic, McapError, RecordLengthLimitExceeded
 from .opcode import Opcode
 from .records import (
+    MESSAGE_FIELDS,
     Attachment,
     AttachmentIndex,
     Channel,
@@ -45,30 +46,52 @@ class CRCValidationError(ValueError):
 
 
 def breakup_chunk(chunk: Chunk, validate_crc: bool = False) -> List[McapRecord]:
-    stream, stream_length = get_chunk_data_stream(chunk, validate_crc=validate_crc)
+    data = get_chunk_data(chunk, validate_crc=validate_crc)
+    buffer = BytesIO(data)
+    stream = ReadDataStream(buffer)
     records: List[McapRecord] = []
-    while stream.count < stream_length:
-        opcode = stream.read1()
-        length = stream.read8()
-        if opcode == Opcode.CHANNEL:
-            channel = Channel.read(stream)
-            records.append(channel)
-        elif opcode == Opcode.MESSAGE:
-            message = Message.read(stream, length)
-            records.append(message)
+    offset = 0
+    end = len(data)
+    while offset < end:
+        if offset + RECORD_HEADER.size > end:
+            raise EndOfFile()
+        opcode, length = RECORD_HEADER.unpack_from(data, offset)
+        offset += RECORD_HEADER.size
+        if offset + length > end:
+            raise EndOfFile()
+        if opcode == Opcode.MESSAGE:
+            if length < MESSAGE_FIELDS.size:
+                raise McapError(
+                    f"Message record has length {length}, which is shorter than its "
+                    f"{MESSAGE_FIELDS.size} bytes of fixed-size fields"
+                )
+            # Messages make up most of a chunk, so they are unpacked straight from the chunk
+            # data, with one copy of the payload.
+            channel_id, sequence, log_time, publish_time = MESSAGE_FIELDS.unpack_from(
+                data, offset
+            )
+            records.append(
+                Message(
+                    channel_id=channel_id,
+                    log_time=log_time,
+                    data=data[offset + MESSAGE_FIELDS.size : offset + length],
+                    publish_time=publish_time,
+                    sequence=sequence,
+                )
+            )
+        elif opcode == Opcode.CHANNEL:
+            buffer.seek(offset)
+            records.append(Channel.read(stream))
         elif opcode == Opcode.SCHEMA:
-            schema = Schema.read(stream)
-            records.append(schema)
-        else:
-            # Unknown chunk record type
-            stream.read(length)
+            buffer.seek(offset)
+            records.append(Schema.read(stream))
+        # Unknown chunk record types are skipped.
+        offset += length
 
     return records
 
 
-def get_chunk_data_stream(
-    chunk: Chunk, validate_crc: bool = False
-) -> Tuple[ReadDataStream, int]:
+def get_chunk_data(chunk: Chunk, validate_crc: bool = False) -> bytes:
     if chunk.compression == "zstd":
         data: bytes = zstandard.decompress(chunk.data, chunk.uncompressed_size)
     elif chunk.compression == "lz4":
@@ -85,6 +108,13 @@ def get_chunk_data_stream(
                 record=chunk,
             )
 
+    return data
+
+
+def get_chunk_data_stream(
+    chunk: Chunk, validate_crc: bool = False
+) -> Tuple[ReadDataStream, int]:
+    data = get_chunk_data(chunk, validate_crc=validate_crc)
     return ReadDataStream(BytesIO(data)), len(data)
 
 
@@ -153,8 +183,7 @@ class StreamReader:
             # Can't validate the data_end crc if we skip magic.
             if self._validate_crcs and not self._skip_magic:
                 checksum_before_read = self._stream.checksum()
-            opcode = self._stream.read1()
-            length = self._stream.read8()
+            opcode, length = self._stream.read_record_header()
             if self._record_size_limit is not None and length > self._record_size_limit:
                 raise RecordLengthLimitExceeded(opcode, length, self._record_size_limit)
             count = self._stream.count
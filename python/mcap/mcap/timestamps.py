@@ -0,0 +1,20 @@
+"""Conversions between :py:class:`~datetime.datetime` objects and the POSIX nanosecond
+timestamps used by MCAP records."""
+
+from datetime import datetime
+
+
+def datetime_to_ns(value: datetime) -> int:
+    """Converts a datetime to a POSIX nanosecond timestamp. The seconds and microseconds are
+    converted separately, since converting through a floating point number of seconds loses
+    precision for current dates."""
+    seconds = int(value.replace(microsecond=0).timestamp())
+    return seconds * 1_000_000_000 + value.microsecond * 1000
+
+
+def ns_to_datetime(ns: int) -> datetime:
+    """Converts a POSIX nanosecond timestamp to a naive local datetime, truncated to
+    microseconds."""
+    return datetime.fromtimestamp(ns // 1_000_000_000).replace(
+        microsecond=(ns // 1000) % 1_000_000
+    )
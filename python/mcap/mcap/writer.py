@@ -3,7 +3,19 @@ import zlib
 from collections import defaultdict
 from enum import Enum, Flag, auto
 from io import BufferedWriter, RawIOBase
-from typing import IO, Any, Dict, List, OrderedDict, Union
+from itertools import repeat
+from typing import (
+    IO,
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    OrderedDict,
+    Tuple,
+    Union,
+)
 
 import lz4.frame  # type: ignore
 import zstandard
@@ -51,6 +63,53 @@ class IndexType(Flag):
     ALL = ATTACHMENT | CHUNK | MESSAGE | METADATA
 
 
+_EXHAUSTED = object()
+_BATCH_LENGTH_MISMATCH = (
+    "log_times, publish_times and sequences must have one value per message"
+)
+
+
+def iter_message_batch(
+    messages: Iterable[Any],
+    log_times: Optional[Iterable[Optional[int]]] = None,
+    publish_times: Optional[Iterable[Optional[int]]] = None,
+    sequences: Optional[Iterable[int]] = None,
+) -> Iterator[Tuple[Any, Optional[int], Optional[int], int]]:
+    """
+    Pairs each message in a batch with its log time, publish time and sequence number, for
+    writers that accept a batch of messages with a separate iterable for each of these fields.
+    Fields that are not given are ``None`` for the times and ``0`` for the sequence number.
+
+    :param messages: The messages in the batch.
+    :param log_times: If given, must yield one log time per message.
+    :param publish_times: If given, must yield one publish time per message.
+    :param sequences: If given, must yield one sequence number per message.
+    :raises ValueError: if one of the given fields yields fewer or more values than there are
+        messages. The tuples for the messages before the mismatch have already been yielded.
+    """
+    log_time_iter = repeat(None) if log_times is None else iter(log_times)
+    publish_time_iter = repeat(None) if publish_times is None else iter(publish_times)
+    sequence_iter = repeat(0) if sequences is None else iter(sequences)
+    for message in messages:
+        log_time = next(log_time_iter, _EXHAUSTED)
+        publish_time = next(publish_time_iter, _EXHAUSTED)
+        sequence = next(sequence_iter, _EXHAUSTED)
+        if (
+            log_time is _EXHAUSTED
+            or publish_time is _EXHAUSTED
+            or sequence is _EXHAUSTED
+        ):
+            raise ValueError(_BATCH_LENGTH_MISMATCH)
+        yield message, log_time, publish_time, sequence  # type: ignore
+    for given, values in (
+        (log_times, log_time_iter),
+        (publish_times, publish_time_iter),
+        (sequences, sequence_iter),
+    ):
+        if given is not None and next(values, _EXHAUSTED) is not _EXHAUSTED:
+            raise ValueError(_BATCH_LENGTH_MISMATCH)
+
+
 class Writer:
     """
     Writes MCAP data.
@@ -1,8 +1,12 @@
 from io import BytesIO
 
+import pytest
+
 from mcap.data_stream import RecordBuilder
-from mcap.records import Statistics
-from mcap.stream_reader import StreamReader
+from mcap.exceptions import EndOfFile, McapError
+from mcap.opcode import Opcode
+from mcap.records import Chunk, Message, Statistics
+from mcap.stream_reader import StreamReader, breakup_chunk
 
 
 def test_statistics_serialization():
@@ -29,3 +33,30 @@ def test_statistics_serialization():
     reader = StreamReader(input=BytesIO(buf), skip_magic=True)
     new_s = next(reader.records)
     assert s == new_s
+
+
+def _chunk(data: bytes) -> Chunk:
+    return Chunk(
+        compression="",
+        data=data,
+        message_end_time=0,
+        message_start_time=0,
+        uncompressed_crc=0,
+        uncompressed_size=len(data),
+    )
+
+
+def test_breakup_chunk():
+    message = Message(channel_id=1, log_time=2, data=b"abc", publish_time=3, sequence=4)
+    builder = RecordBuilder()
+    message.write(builder)
+    data = builder.end()
+    assert breakup_chunk(_chunk(data)) == [message]
+
+    for length in (5, len(data) - 1):
+        with pytest.raises(EndOfFile):
+            breakup_chunk(_chunk(data[:length]))
+
+    short_message = bytes([Opcode.MESSAGE]) + (4).to_bytes(8, "little") + bytes(4)
+    with pytest.raises(McapError, match="shorter than its 22 bytes"):
+        breakup_chunk(_chunk(short_message))
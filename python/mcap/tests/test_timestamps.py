@@ -0,0 +1,42 @@
+from datetime import datetime, timedelta, timezone
+
+from mcap.timestamps import datetime_to_ns, ns_to_datetime
+
+# 2024-05-06T07:08:09.123456Z, which a float number of seconds can't hold to the microsecond.
+RECENT_NS = 1_714_979_289_123_456_000
+
+
+def test_datetime_to_ns():
+    value = datetime(2024, 5, 6, 7, 8, 9, 123456, tzinfo=timezone.utc)
+    assert datetime_to_ns(value) == RECENT_NS
+    # naive datetimes are local times.
+    assert datetime_to_ns(value.astimezone().replace(tzinfo=None)) == RECENT_NS
+
+
+def test_datetime_to_ns_with_timezone():
+    value = datetime(2024, 5, 6, 9, 8, 9, 123456, tzinfo=timezone(timedelta(hours=2)))
+    assert datetime_to_ns(value) == RECENT_NS
+
+
+def test_datetime_to_ns_before_epoch():
+    value = datetime(1969, 12, 31, 23, 59, 58, 250000, tzinfo=timezone.utc)
+    assert datetime_to_ns(value) == -1_750_000_000
+
+
+def test_ns_to_datetime():
+    value = ns_to_datetime(RECENT_NS)
+    assert value.tzinfo is None
+    assert value.microsecond == 123456
+    assert datetime_to_ns(value) == RECENT_NS
+
+
+def test_ns_to_datetime_before_epoch():
+    value = ns_to_datetime(-1_750_000_000)
+    assert value.microsecond == 250000
+    assert datetime_to_ns(value) == -1_750_000_000
+
+
+def test_ns_to_datetime_truncates_nanoseconds():
+    # nanoseconds below a microsecond are dropped rather than rounded.
+    assert ns_to_datetime(RECENT_NS + 999).microsecond == 123456
+    assert datetime_to_ns(ns_to_datetime(-1_750_000_001)) == -1_750_001_000
@@ -10,7 +10,7 @@ import pytest
 
 from mcap.records import Chunk, ChunkIndex, Statistics
 from mcap.stream_reader import StreamReader
-from mcap.writer import CompressionType, Writer
+from mcap.writer import CompressionType, Writer, iter_message_batch
 
 
 @contextlib.contextmanager
@@ -115,3 +115,16 @@ def test_out_of_order_messages():
     chunk_index = next(r for r in records if isinstance(r, ChunkIndex))
     assert chunk_index.message_start_time == 0
     assert chunk_index.message_end_time == 100
+
+
+def test_iter_message_batch():
+    assert list(iter_message_batch("ab", log_times=[1, 2])) == [
+        ("a", 1, None, 0),
+        ("b", 2, None, 0),
+    ]
+    batch = iter_message_batch("ab", publish_times=[1])
+    assert next(batch) == ("a", None, 1, 0)
+    with pytest.raises(ValueError, match="one value per message"):
+        next(batch)
+    with pytest.raises(ValueError, match="one value per message"):
+        list(iter_message_batch("ab", sequences=iter(range(3))))